@@ -2,6 +2,9 @@
 ASGI config for kisinia project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn kisinia.asgi:application``) so the
+live seat-count stream at /events/seats/ can hold connections open without
+tying up a worker thread each.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
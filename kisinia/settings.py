@@ -43,23 +43,60 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yosa.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'yosa.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Request profiling (see yosa.middleware.ProfilingMiddleware)
+# Fraction of requests to profile; staff can also send the header to force it
+PROFILING_SAMPLE_RATE = 0.0
+PROFILING_HEADER = 'X-Profile'
+PROFILING_DIR = BASE_DIR / 'profiles'
+PROFILING_MAX_FILES = 500
+
+# Per-worker metrics files behind /metrics (see yosa.metrics); clear on deploy.
+# The test runner points this at a temporary directory.
+METRICS_DIR = BASE_DIR / 'metrics'
+
+# How often coalesced seat-count updates are pushed to the SSE stream (seconds)
+SEAT_UPDATE_INTERVAL = 1.0
+
+# Recurring event series: occurrences inside the first window get Event rows
+# (manage.py materialize_series); listings expand the rule up to the second
+SERIES_MATERIALIZE_DAYS = 14
+SERIES_LISTING_DAYS = 90
+# How long each worker caches the active series list (seconds)
+SERIES_CACHE_TIMEOUT = 60
+
+# Token-bucket rate limits (see yosa.throttle). Views set their own rates;
+# override them per scope here, e.g. {'login': {'ip': '5/m'}}
+THROTTLE_ENABLED = True
+THROTTLE_RATES = {}
+THROTTLE_MAX_KEYS = 10000
+# Request.META key holding the client address; 'HTTP_X_REAL_IP' behind nginx
+THROTTLE_IP_HEADER = 'REMOTE_ADDR'
+
 ROOT_URLCONF = 'kisinia.urls'
 
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR/ 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Parse each template once per process instead of on every render
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
@@ -80,6 +117,12 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Let the front server send media files once serve_media has checked access.
+# nginx: internal location prefix for X-Accel-Redirect, e.g. '/protected-media/'
+MEDIA_X_ACCEL_REDIRECT_PREFIX = None
+# Apache mod_xsendfile / lighttpd
+MEDIA_X_SENDFILE = False
+
 # Login/Logout URLs
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'dashboard'
@@ -100,6 +143,25 @@ DATABASES = {
 }
 
 
+# Cache, sessions and authentication
+# Sessions are read from the local cache and only fall back to the database
+# on a miss; the User row is cached per user by CachedModelBackend.
+
+CACHES = {
+    'default': {
+        # LocMemCache that counts hits/misses per cache in /metrics
+        'BACKEND': 'yosa.cache.MeteredLocMemCache',
+        'LOCATION': 'kisinia-default',
+    }
+}
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+AUTHENTICATION_BACKENDS = ['yosa.backends.CachedModelBackend']
+
+USER_CACHE_TIMEOUT = 300
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -140,3 +202,5 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+TEST_RUNNER = 'yosa.test_runner.TestRunner'
@@ -14,20 +14,27 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from yosa.views import serve_media, metrics_view
 
 urlpatterns = [
     # Admin panel
     path('admin/', admin.site.urls),
     
+    # Uploaded media, permission-checked and handed off to the front server when configured
+    re_path(r'^%s(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
+    
+    # Prometheus scrape endpoint (staff only)
+    path('metrics', metrics_view, name='metrics'),
+    
     # All app URLs - includes home, login, register, dashboard, etc.
     path('', include('yosa.urls')),
 ]
 
-# Add media and static files support for development
+# Add static files support for development
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
@@ -1,6 +1,9 @@
 from django.contrib import admin
+from django.shortcuts import redirect
+from django.urls import reverse
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Event, Registration, Message, Trending
+from .models import (User, Venue, Event, EventSeries, Registration, Message, Broadcast, Trending,
+                     ArchivedEvent, ArchivedRegistration, ArchivedMessage)
 
 # Custom User Display
 class UserAdmin(BaseUserAdmin):
@@ -22,14 +25,35 @@ class RegistrationInline(admin.TabularInline):
     readonly_fields = ('registration_date',)
     can_delete = True
 
+# Venue Admin
+@admin.register(Venue)
+class VenueAdmin(admin.ModelAdmin):
+    list_display = ('name', 'address', 'latitude', 'longitude')
+    search_fields = ('name', 'address')
+
 # Event Admin
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
-    list_display = ('title', 'event_type', 'date', 'location', 'max_attendees', 'current_attendees', 'is_active')
-    list_filter = ('event_type', 'is_active')
+    list_display = ('title', 'event_type', 'date', 'location', 'venue', 'max_attendees', 'current_attendees', 'is_active')
+    list_filter = ('event_type', 'is_active', 'series')
     search_fields = ('title', 'description', 'location')
+    autocomplete_fields = ('venue',)
     inlines = [RegistrationInline]
     readonly_fields = ('current_attendees',)
+    actions = ['broadcast_to_attendees']
+    
+    @admin.action(description='Broadcast a message to confirmed attendees')
+    def broadcast_to_attendees(self, request, queryset):
+        ids = ','.join(str(pk) for pk in queryset.values_list('pk', flat=True))
+        return redirect(f"{reverse('admin:yosa_broadcast_add')}?events={ids}")
+
+# Event Series Admin
+@admin.register(EventSeries)
+class EventSeriesAdmin(admin.ModelAdmin):
+    list_display = ('title', 'event_type', 'frequency', 'interval', 'start', 'until', 'max_attendees', 'is_active')
+    list_filter = ('event_type', 'frequency', 'is_active')
+    search_fields = ('title', 'description', 'location')
+    autocomplete_fields = ('venue',)
 
 # Registration Admin
 @admin.register(Registration)
@@ -45,12 +69,56 @@ class MessageAdmin(admin.ModelAdmin):
     list_filter = ('is_feedback', 'is_read', 'created_at')
     search_fields = ('subject', 'content', 'sender__username')
 
+# Broadcast Admin
+@admin.register(Broadcast)
+class BroadcastAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'sender', 'created_at')
+    search_fields = ('subject', 'content')
+    filter_horizontal = ('events',)
+    exclude = ('sender',)
+    
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.sender = request.user
+        super().save_model(request, obj, form, change)
+
 # Trending Admin
 @admin.register(Trending)
 class TrendingAdmin(admin.ModelAdmin):
     list_display = ('event', 'views', 'clicks', 'last_updated')
     list_filter = ('last_updated',)
 
+# Archive admins are read-only; rows only get there through archive_old_data
+class ReadOnlyMixin:
+    def has_add_permission(self, request, obj=None):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+class ArchivedRegistrationInline(ReadOnlyMixin, admin.TabularInline):
+    model = ArchivedRegistration
+    extra = 0
+
+@admin.register(ArchivedEvent)
+class ArchivedEventAdmin(ReadOnlyMixin, admin.ModelAdmin):
+    list_display = ('title', 'event_type', 'date', 'location', 'max_attendees', 'current_attendees', 'archived_at')
+    list_filter = ('event_type',)
+    search_fields = ('title', 'description', 'location')
+    inlines = [ArchivedRegistrationInline]
+
+@admin.register(ArchivedRegistration)
+class ArchivedRegistrationAdmin(ReadOnlyMixin, admin.ModelAdmin):
+    list_display = ('user', 'event_id', 'registration_date', 'status', 'archived_at')
+    list_filter = ('status',)
+    search_fields = ('user__username',)
+
+@admin.register(ArchivedMessage)
+class ArchivedMessageAdmin(ReadOnlyMixin, admin.ModelAdmin):
+    list_display = ('subject', 'sender', 'receiver', 'is_feedback', 'created_at', 'archived_at')
+    list_filter = ('is_feedback',)
+    search_fields = ('subject', 'content', 'sender__username')
+
 # Register User model
 admin.site.register(User, UserAdmin)
 
@@ -0,0 +1,36 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import DailyEventStats
+
+
+def update_daily_stats(event, day=None, **increments):
+    """
+    Add `increments` (registrations=1, views=1, ...) to the row for `event`
+    on `day` (default today), creating the row if needed. Today's row also
+    gets the current attendance snapshot; past days keep theirs.
+    """
+    today = timezone.localdate()
+    day = day or today
+    values = {}
+    if day == today:
+        values = {'attendees': event.current_attendees, 'capacity': event.max_attendees}
+    updates = {name: F(name) + delta for name, delta in increments.items()}
+    
+    rows = DailyEventStats.objects.filter(event_id=event.pk, day=day)
+    if rows.update(**updates, **values):
+        return
+    try:
+        with transaction.atomic():
+            DailyEventStats.objects.create(event_id=event.pk, event_type=event.event_type,
+                                           day=day, **increments, **values)
+    except IntegrityError:
+        # Another request created the row first
+        rows.update(**updates, **values)
+
+
+def registration_changed(registration, was_confirmed, is_confirmed):
+    if is_confirmed and not was_confirmed:
+        update_daily_stats(registration.event, registrations=1)
+    elif was_confirmed and not is_confirmed:
+        update_daily_stats(registration.event, cancellations=1)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class YosaConfig(AppConfig):
     name = 'yosa'
+
+    def ready(self):
+        from . import signals  # noqa: F401
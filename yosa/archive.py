@@ -0,0 +1,63 @@
+from django.db import transaction
+from django.db.models import F
+from .models import (Event, Registration, Message, Broadcast,
+                     ArchivedEvent, ArchivedRegistration, ArchivedBroadcastEvent, ArchivedMessage)
+
+
+def _copy(obj, archive_model):
+    fields = {f.attname for f in archive_model._meta.concrete_fields} - {'archived_at'}
+    return archive_model(**{name: getattr(obj, name) for name in fields})
+
+
+def _move_in_chunks(queryset, archive_model, chunk_size, related=None):
+    """
+    Copy rows of `queryset` into `archive_model` and delete them, one
+    transaction per chunk. `related` optionally maps a chunk of ids to
+    (queryset, archive_model) pairs that have to move along with it.
+    """
+    moved = 0
+    while True:
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            return moved
+        with transaction.atomic():
+            for child_queryset, child_model in (related(ids) if related else []):
+                child_model.objects.bulk_create([_copy(obj, child_model) for obj in child_queryset])
+            archive_model.objects.bulk_create([_copy(obj, archive_model) for obj in queryset.filter(pk__in=ids)])
+            queryset.model.objects.filter(pk__in=ids).delete()
+        moved += len(ids)
+
+
+def _with_check_in(registrations):
+    # CheckIn rows cascade away with their registration; keep the time
+    return registrations.annotate(checked_in_at=F('check_in__checked_in_at'))
+
+
+def archive_events(cutoff, chunk_size=500):
+    """Move events held before `cutoff` into the archive, with their registrations and broadcast links."""
+    return _move_in_chunks(
+        Event.objects.filter(date__lt=cutoff),
+        ArchivedEvent,
+        chunk_size,
+        related=lambda ids: [
+            (_with_check_in(Registration.objects.filter(event_id__in=ids)), ArchivedRegistration),
+            (Broadcast.events.through.objects.filter(event_id__in=ids), ArchivedBroadcastEvent),
+        ],
+    )
+
+
+def archive_cancelled_registrations(chunk_size=500):
+    return _move_in_chunks(
+        _with_check_in(Registration.objects.filter(status='cancelled')),
+        ArchivedRegistration,
+        chunk_size,
+    )
+
+
+def archive_messages(cutoff, chunk_size=500):
+    """Move read messages older than `cutoff` into the archive."""
+    return _move_in_chunks(
+        Message.objects.filter(is_read=True, created_at__lt=cutoff),
+        ArchivedMessage,
+        chunk_size,
+    )
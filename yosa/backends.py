@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+USER_CACHE_TIMEOUT = getattr(settings, 'USER_CACHE_TIMEOUT', 300)
+
+
+def user_cache_key(user_id):
+    return f'yosa:user:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that keeps the User row in the cache so the
+    AuthenticationMiddleware lookup doesn't hit the database on every request.
+
+    Entries are dropped whenever the user is saved or deleted (see signals.py).
+    The cache is per process, so the timeout bounds how long another worker
+    can keep serving a stale row.
+    """
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
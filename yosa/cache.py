@@ -0,0 +1,28 @@
+from django.core.cache.backends.locmem import LocMemCache
+from .metrics import CACHE_REQUESTS
+
+_MISSING = object()
+
+# Key prefix -> `cache` label on yosa_cache_requests_total
+CACHE_NAMES = [
+    ('yosa:user:', 'user'),
+    ('yosa:active_series', 'series'),
+    ('django.contrib.sessions.cached_db', 'session'),
+    ('template.cache.', 'template_fragment'),
+]
+
+
+def cache_name(key):
+    for prefix, name in CACHE_NAMES:
+        if key.startswith(prefix):
+            return name
+    return 'other'
+
+
+class MeteredLocMemCache(LocMemCache):
+    """LocMemCache that counts hits and misses of every get() in yosa.metrics."""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        CACHE_REQUESTS.inc(cache=cache_name(key), result='miss' if value is _MISSING else 'hit')
+        return default if value is _MISSING else value
@@ -1,7 +1,7 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.utils import timezone
-from .models import User, Event, Registration, Message
+from .models import User, Event, Registration, Message, Broadcast
 
 class CustomUserCreationForm(UserCreationForm):
     email = forms.EmailField(required=True)
@@ -24,7 +24,7 @@ class UserUpdateForm(forms.ModelForm):
 class EventForm(forms.ModelForm):
     class Meta:
         model = Event
-        fields = ['title', 'description', 'event_type', 'date', 'location', 'max_attendees', 'image']
+        fields = ['title', 'description', 'event_type', 'date', 'location', 'venue', 'max_attendees', 'image']
         widgets = {
             'date': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
             'description': forms.Textarea(attrs={'rows': 4}),
@@ -71,6 +71,20 @@ class MessageForm(forms.ModelForm):
             request = kwargs.pop('request')
             self.fields['receiver'].queryset = User.objects.exclude(id=request.user.id)
 
+class BroadcastForm(forms.ModelForm):
+    class Meta:
+        model = Broadcast
+        fields = ('events', 'subject', 'content')
+        widgets = {
+            'events': forms.SelectMultiple(attrs={'size': 8}),
+            'subject': forms.TextInput(attrs={'placeholder': 'Subject'}),
+            'content': forms.Textarea(attrs={'rows': 6, 'placeholder': 'Message to all attendees...'}),
+        }
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['events'].queryset = Event.objects.filter(is_active=True).order_by('-date')
+
 class FeedbackForm(forms.ModelForm):
     # Add dropdown choices for subject
     SUBJECT_CHOICES = [
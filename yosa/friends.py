@@ -0,0 +1,74 @@
+from django.db import transaction
+from django.db.models import Count, F
+from .models import Friendship, FriendsAttending, Registration
+
+
+def _confirmed_event_ids(user_id):
+    return list(Registration.objects.filter(
+        user_id=user_id, status='confirmed'
+    ).values_list('event_id', flat=True))
+
+
+def adjust_friends_attending(user_ids, event_ids, delta):
+    """Add `delta` to the count of every (user, event) pair in the cross product."""
+    user_ids, event_ids = list(user_ids), list(event_ids)
+    if not user_ids or not event_ids:
+        return
+    
+    rows = FriendsAttending.objects.filter(user_id__in=user_ids, event_id__in=event_ids)
+    if delta > 0:
+        existing = set(rows.values_list('user_id', 'event_id'))
+        rows.update(count=F('count') + delta)
+        FriendsAttending.objects.bulk_create([
+            FriendsAttending(user_id=user_id, event_id=event_id, count=delta)
+            for user_id in user_ids
+            for event_id in event_ids
+            if (user_id, event_id) not in existing
+        ])
+    else:
+        rows.filter(count__lte=-delta).delete()
+        rows.update(count=F('count') + delta)
+
+
+def registration_changed(registration, was_confirmed, is_confirmed):
+    if is_confirmed == was_confirmed:
+        return
+    friend_ids = Friendship.objects.filter(
+        user_id=registration.user_id
+    ).values_list('friend_id', flat=True)
+    adjust_friends_attending(friend_ids, [registration.event_id], 1 if is_confirmed else -1)
+
+
+@transaction.atomic
+def add_friend(user, friend):
+    if user.pk == friend.pk:
+        return
+    _, created = Friendship.objects.get_or_create(user=user, friend=friend)
+    Friendship.objects.get_or_create(user=friend, friend=user)
+    if created:
+        adjust_friends_attending([user.pk], _confirmed_event_ids(friend.pk), 1)
+        adjust_friends_attending([friend.pk], _confirmed_event_ids(user.pk), 1)
+
+
+@transaction.atomic
+def remove_friend(user, friend):
+    deleted, _ = Friendship.objects.filter(user=user, friend=friend).delete()
+    Friendship.objects.filter(user=friend, friend=user).delete()
+    if deleted:
+        adjust_friends_attending([user.pk], _confirmed_event_ids(friend.pk), -1)
+        adjust_friends_attending([friend.pk], _confirmed_event_ids(user.pk), -1)
+
+
+@transaction.atomic
+def rebuild_friends_attending(batch_size=10000):
+    """Recompute every count from scratch, e.g. after bulk imports."""
+    FriendsAttending.objects.all().delete()
+    counts = Friendship.objects.filter(
+        friend__registration__status='confirmed'
+    ).values_list('user_id', 'friend__registration__event_id').annotate(n=Count('id'))
+    rows = [
+        FriendsAttending(user_id=user_id, event_id=event_id, count=n)
+        for user_id, event_id, n in counts.iterator(chunk_size=batch_size)
+    ]
+    FriendsAttending.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
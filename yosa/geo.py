@@ -0,0 +1,39 @@
+import math
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def bounding_box(lat, lng, radius_km):
+    """(min_lat, max_lat, min_lng, max_lng) enclosing the circle around a point."""
+    dlat = radius_km / KM_PER_DEGREE
+    dlng = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+    return lat - dlat, lat + dlat, lng - dlng, lng + dlng
+
+
+def events_near(events, lat, lng, radius_km=25, limit=50):
+    """
+    Nearest `events` within `radius_km`, closest first, each with a
+    `distance_km` attribute. The indexed bounding box on Venue narrows the
+    candidates in SQL; the exact haversine distance is only computed for those.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    candidates = events.filter(
+        venue__latitude__range=(min_lat, max_lat),
+        venue__longitude__range=(min_lng, max_lng),
+    ).select_related('venue')
+    
+    nearby = []
+    for event in candidates:
+        event.distance_km = haversine_km(lat, lng, event.venue.latitude, event.venue.longitude)
+        if event.distance_km <= radius_km:
+            nearby.append(event)
+    nearby.sort(key=lambda event: (event.distance_km, event.date))
+    return nearby[:limit]
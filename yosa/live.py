@@ -0,0 +1,65 @@
+"""
+Live seat counts pushed over server-sent events (see views.seat_stream).
+
+Event saves call `publisher.publish()` from whatever thread they run in; it
+only records the latest counts per event. A single task on the ASGI event
+loop flushes those every SEAT_UPDATE_INTERVAL seconds to the subscribers of
+each event, so a burst of registrations becomes one update per event per
+interval. Updates are per process: run the ASGI server with one worker
+process, or put a shared broker in front of several.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from django.conf import settings
+
+
+class SeatPublisher:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.subscribers = defaultdict(set)
+        self.task = None
+
+    @property
+    def interval(self):
+        return getattr(settings, 'SEAT_UPDATE_INTERVAL', 1.0)
+
+    def publish(self, event_id, current_attendees, max_attendees):
+        with self.lock:
+            self.pending[event_id] = {
+                'event': event_id,
+                'current_attendees': current_attendees,
+                'max_attendees': max_attendees,
+                'seats_left': max_attendees - current_attendees,
+            }
+
+    def subscribe(self, event_ids):
+        queue = asyncio.Queue()
+        for event_id in event_ids:
+            self.subscribers[event_id].add(queue)
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+        return queue
+
+    def unsubscribe(self, queue, event_ids):
+        for event_id in event_ids:
+            self.subscribers[event_id].discard(queue)
+            if not self.subscribers[event_id]:
+                del self.subscribers[event_id]
+
+    def flush(self):
+        with self.lock:
+            updates, self.pending = self.pending, {}
+        for event_id, update in updates.items():
+            for queue in self.subscribers.get(event_id, ()):
+                queue.put_nowait(update)
+        return len(updates)
+
+    async def run(self):
+        while self.subscribers:
+            await asyncio.sleep(self.interval)
+            self.flush()
+
+
+publisher = SeatPublisher()
@@ -0,0 +1,32 @@
+import os
+import pstats
+from collections import defaultdict
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Merge the profiles written by ProfilingMiddleware per view and print the top hotspots'
+
+    def add_arguments(self, parser):
+        parser.add_argument('views', nargs='*', help='Only these view names (default: all)')
+        parser.add_argument('--dir', default=getattr(settings, 'PROFILING_DIR', None))
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--sort', default='cumulative')
+
+    def handle(self, *args, **options):
+        directory = options['dir']
+        if not directory or not os.path.isdir(directory):
+            raise CommandError(f'No profile directory at {directory!r}')
+
+        by_view = defaultdict(list)
+        for name in sorted(os.listdir(directory)):
+            if name.endswith('.prof'):
+                by_view[name.split('.', 1)[0]].append(os.path.join(directory, name))
+
+        for view_name, files in sorted(by_view.items()):
+            if options['views'] and view_name not in options['views']:
+                continue
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{view_name} ({len(files)} requests)'))
+            stats = pstats.Stats(*files, stream=self.stdout)
+            stats.strip_dirs().sort_stats(options['sort']).print_stats(options['limit'])
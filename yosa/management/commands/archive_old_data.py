@@ -0,0 +1,27 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from yosa.archive import archive_events, archive_cancelled_registrations, archive_messages
+
+
+class Command(BaseCommand):
+    help = 'Move past events, cancelled registrations and old read messages into the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--event-days', type=int, default=90,
+                            help='Archive events that ended more than this many days ago')
+        parser.add_argument('--message-days', type=int, default=180,
+                            help='Archive read messages older than this many days')
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        chunk_size = options['chunk_size']
+
+        cancelled = archive_cancelled_registrations(chunk_size)
+        events = archive_events(now - timedelta(days=options['event_days']), chunk_size)
+        messages = archive_messages(now - timedelta(days=options['message_days']), chunk_size)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {events} events, {cancelled} cancelled registrations and {messages} messages'
+        ))
@@ -0,0 +1,57 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template
+from django.test import RequestFactory
+from django.utils import timezone
+from yosa.models import User, Event, Registration
+
+
+class Command(BaseCommand):
+    help = 'Report render time per template at realistic list sizes (no database needed)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=200, help='Number of events per list')
+        parser.add_argument('--iterations', type=int, default=50)
+
+    def handle(self, *args, **options):
+        size = options['size']
+        iterations = options['iterations']
+
+        request = RequestFactory().get('/')
+        request.user = User(id=1, username='bench')
+        now = timezone.now()
+        events = [
+            Event(id=i, title=f'Event {i}', description='Bring a friend. ' * 20,
+                  event_type='party', date=now + timedelta(days=i), location='Kisii',
+                  max_attendees=100, current_attendees=i % 100)
+            for i in range(1, size + 1)
+        ]
+        registrations = [Registration(id=e.id, user=request.user, event=e) for e in events]
+
+        contexts = {
+            'yosa/home.html': {'upcoming_events': events[:3], 'trending_events': events[:3]},
+            'yosa/events.html': {'events': events},
+            'yosa/past_events.html': {'past_registrations': registrations,
+                                      'all_past_events': events},
+            'yosa/dashboard.html': {'user': request.user,
+                                    'upcoming_registrations': registrations[:20],
+                                    'past_registrations': registrations,
+                                    'friends_count': 12,
+                                    'upcoming_events': events[:5],
+                                    'trending_events': events[:5]},
+        }
+
+        self.stdout.write(f'{"template":<28}{"first (ms)":>12}{"mean (ms)":>12}{"KB":>8}')
+        for name, context in contexts.items():
+            start = time.perf_counter()
+            template = get_template(name)
+            html = template.render(context, request)
+            first = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            for _ in range(iterations):
+                template.render(context, request)
+            mean = (time.perf_counter() - start) * 1000 / iterations
+
+            self.stdout.write(f'{name:<28}{first:>12.2f}{mean:>12.2f}{len(html) / 1024:>8.1f}')
@@ -0,0 +1,63 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from yosa.models import User, Event
+from yosa.throttle import buckets
+
+
+def percentile(timings, p):
+    timings = sorted(timings)
+    return timings[max(int(len(timings) * p) - 1, 0)] * 1000
+
+
+class Command(BaseCommand):
+    help = ('Load-test event_detail: latency for a legitimate user with and without '
+            'an abusive client alongside (runs in a rolled-back transaction)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Requests by the legitimate user per phase')
+        parser.add_argument('--burst', type=int, default=20, help='Abusive requests per legitimate request')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(options['requests'], options['burst'])
+            transaction.set_rollback(True)
+        buckets.reset()
+
+    def run(self, requests, burst):
+        buckets.reset()
+        event = Event.objects.create(title='Bench', description='', event_type='party',
+                                     date=timezone.now() + timedelta(days=3), location='Kisii',
+                                     max_attendees=100)
+        url = reverse('event_detail', args=[event.pk])
+        legit = Client(HTTP_HOST='localhost', REMOTE_ADDR='10.0.0.1')
+        bot = Client(HTTP_HOST='localhost', REMOTE_ADDR='10.0.0.66')
+        legit.force_login(User.objects.create(username='bench_legit'))
+        bot.force_login(User.objects.create(username='bench_bot'))
+
+        def timed_get(client):
+            start = time.perf_counter()
+            response = client.get(url)
+            return response.status_code, time.perf_counter() - start
+
+        baseline = [timed_get(legit)[1] for _ in range(requests)]
+        buckets.reset()
+        under_attack, bot_ok, bot_rejected = [], [], []
+        for _ in range(requests):
+            under_attack.append(timed_get(legit)[1])
+            for _ in range(burst):
+                status, elapsed = timed_get(bot)
+                (bot_rejected if status == 429 else bot_ok).append(elapsed)
+
+        self.stdout.write(f'{"client":<28}{"requests":>10}{"p50 (ms)":>12}{"p95 (ms)":>12}')
+        for name, timings in [('legitimate, alone', baseline),
+                              ('legitimate, under attack', under_attack),
+                              ('abusive, served', bot_ok),
+                              ('abusive, throttled (429)', bot_rejected)]:
+            if timings:
+                self.stdout.write(f'{name:<28}{len(timings):>10}'
+                                  f'{percentile(timings, 0.5):>12.2f}{percentile(timings, 0.95):>12.2f}')
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from yosa.models import Registration, EventSimilarity
+from yosa.recommendations import build_similarity
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the top-K similar events for each event from co-registrations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=10)
+        parser.add_argument('--batch-size', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        pairs = (
+            Registration.objects.filter(status='confirmed')
+            .order_by('user_id')
+            .values_list('user_id', 'event_id')
+            .iterator(chunk_size=batch_size)
+        )
+        neighbours = build_similarity(pairs, top_k=options['top_k'])
+
+        rows = [
+            EventSimilarity(event_id=event_id, similar_event_id=other, score=score)
+            for event_id, similar in neighbours.items()
+            for score, other in similar
+        ]
+        with transaction.atomic():
+            EventSimilarity.objects.all().delete()
+            EventSimilarity.objects.bulk_create(rows, batch_size=batch_size)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {len(rows)} similarities for {len(neighbours)} events'
+        ))
@@ -0,0 +1,35 @@
+import sys
+import time
+from collections import Counter
+from django.core.management.base import BaseCommand
+from yosa.tickets import CheckInRecorder, build_revocations, check_in, preload_revocations
+
+
+class Command(BaseCommand):
+    help = 'Validate scanned tickets offline and record the check-ins in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tokens', nargs='*', help='Ticket tokens (default: one per line on stdin)')
+        parser.add_argument('--event', type=int, help='Reject tickets for any other event')
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        # One query up front; after this only revoked-looking tickets touch the DB
+        preload_revocations(build_revocations())
+        recorder = CheckInRecorder(batch_size=options['batch_size'], max_delay=float('inf'))
+
+        tokens = options['tokens'] or (line for line in sys.stdin if line.strip())
+        results = Counter()
+        started = time.perf_counter()
+        for token in tokens:
+            status, registration_id = check_in(token, event_id=options['event'], recorder=recorder)
+            results[status] += 1
+            self.stdout.write(f'{status:<12}{registration_id or "-"}')
+        recorder.flush()
+
+        elapsed = time.perf_counter() - started
+        total = sum(results.values())
+        summary = ', '.join(f'{count} {status}' for status, count in sorted(results.items()))
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} tickets in {elapsed:.2f}s ({summary or "none"})'
+        ))
@@ -0,0 +1,27 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from yosa.models import Event, EventSeries
+
+
+class Command(BaseCommand):
+    help = 'Create Event rows for recurring series occurrences inside the rolling window'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=getattr(settings, 'SERIES_MATERIALIZE_DAYS', 14))
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        until = now + timedelta(days=options['days'])
+        events = [
+            series.build_occurrence(date)
+            for series in EventSeries.objects.filter(is_active=True)
+            for date in series.occurrences(now, until)
+        ]
+        # Occurrences that already exist (or were registered for early) are
+        # skipped by the unique (series, date) constraint
+        before = Event.objects.filter(series__isnull=False).count()
+        Event.objects.bulk_create(events, ignore_conflicts=True)
+        created = Event.objects.filter(series__isnull=False).count() - before
+        self.stdout.write(self.style.SUCCESS(f'Created {created} of {len(events)} occurrences up to {until:%Y-%m-%d}'))
@@ -0,0 +1,29 @@
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Delete expired sessions in small chunks so the table is never locked for long'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        now = timezone.now()
+        total = 0
+
+        while True:
+            keys = list(
+                Session.objects.filter(expire_date__lt=now)
+                .values_list('session_key', flat=True)[:chunk_size]
+            )
+            if not keys:
+                break
+            with transaction.atomic():
+                deleted, _ = Session.objects.filter(session_key__in=keys).delete()
+            total += deleted
+
+        self.stdout.write(self.style.SUCCESS(f'Purged {total} expired sessions'))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from yosa.friends import rebuild_friends_attending
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-(user, event) "friends attending" counts'
+
+    def handle(self, *args, **options):
+        rows = rebuild_friends_attending()
+        self.stdout.write(self.style.SUCCESS(f'Stored {rows} friends-attending counts'))
@@ -0,0 +1,52 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+from django.utils import timezone
+from yosa.analytics import update_daily_stats
+from yosa.models import Event, Registration, Trending, DailyEventStats
+
+
+class Command(BaseCommand):
+    help = 'Catch the daily analytics rollups up with the raw tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=2,
+                            help='Recount registrations for this many recent days')
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        since = today - timedelta(days=options['days'] - 1)
+        events = Event.objects.only(
+            'event_type', 'date', 'current_attendees', 'max_attendees'
+        ).in_bulk()
+
+        # Registrations created per event per day; cancellations have no
+        # timestamp of their own, so those only come from the live signals
+        created = Registration.objects.filter(
+            registration_date__date__gte=since
+        ).values_list('event_id', 'registration_date__date').annotate(n=Count('id'))
+        for event_id, day, n in created:
+            update_daily_stats(events[event_id], day=day)
+            DailyEventStats.objects.filter(event_id=event_id, day=day).update(registrations=n)
+
+        # Trending only holds running totals; book whatever the rollups
+        # haven't seen yet against today
+        seen = {
+            event_id: (views, clicks)
+            for event_id, views, clicks in DailyEventStats.objects.values_list('event_id')
+            .annotate(views=Sum('views'), clicks=Sum('clicks'))
+        }
+        for trending in Trending.objects.all():
+            seen_views, seen_clicks = seen.get(trending.event_id, (0, 0))
+            views = max(trending.views - seen_views, 0)
+            clicks = max(trending.clicks - seen_clicks, 0)
+            if views or clicks:
+                update_daily_stats(events[trending.event_id], views=views, clicks=clicks)
+
+        # Attendance snapshot for every upcoming event, so fill rates have a
+        # point for each day even without activity
+        for event in events.values():
+            if event.date >= timezone.now():
+                update_daily_stats(event)
+
+        self.stdout.write(self.style.SUCCESS(f'Rolled up stats since {since}'))
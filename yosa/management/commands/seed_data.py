@@ -0,0 +1,218 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from yosa.models import User, Venue, Event, Registration, Message, Trending
+
+EVENT_TYPES = [key for key, _ in Event.EVENT_TYPES]
+TOWNS = ['Kisii', 'Nyamira', 'Keroka', 'Ogembo', 'Suneka', 'Nyansiongo', 'Kisumu', 'Nairobi']
+
+
+class Command(BaseCommand):
+    help = ('Generate synthetic users, events, registrations, messages and trending rows '
+            'for benchmarking, e.g. --users 100000 --events 50000 --registrations 5000000. '
+            'Each --seed can be loaded once per database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--venues', type=int, default=None, help='Default: events / 10')
+        parser.add_argument('--events', type=int, default=500)
+        parser.add_argument('--registrations', type=int, default=20000)
+        parser.add_argument('--messages', type=int, default=5000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.prefix = f"seed{options['seed']}"
+        self.now = timezone.now()
+        if User.objects.filter(username__startswith=f'{self.prefix}_').exists():
+            raise CommandError(f'Data for --seed {options["seed"]} is already loaded; '
+                               'pick another seed or start from an empty database.')
+        started = time.perf_counter()
+
+        with fast_bulk_load(), deferred_indexes([Registration, Message, Trending]):
+            user_ids = self.create_users(options['users'])
+            venue_ids = self.create_venues(options['venues'] or max(options['events'] // 10, 1))
+            event_ids, attendees = self.create_events(options['events'], venue_ids,
+                                                      options['registrations'], len(user_ids))
+            self.create_registrations(event_ids, attendees, user_ids)
+            self.create_messages(options['messages'], user_ids)
+            self.create_trending(event_ids)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Done in {elapsed:.1f}s. Run rebuild_friend_counts, '
+                                             'build_recommendations and rollup_stats to refresh '
+                                             'the derived tables.'))
+
+    def bulk_create(self, model, rows, fields=None):
+        """
+        Insert a generator of rows in batches, one transaction per batch.
+        Rows are unsaved instances, or with `fields` plain tuples of those
+        columns' database values, which skips building model instances.
+        """
+        start = model.objects.aggregate(start=Max('id'))['start'] or 0
+        if fields:
+            sql = self.insert_sql(model, fields)
+        total = 0
+        began = time.perf_counter()
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == self.batch_size:
+                total += self.flush(model, batch, sql if fields else None)
+                batch = []
+        total += self.flush(model, batch, sql if fields else None)
+        elapsed = time.perf_counter() - began
+        self.stdout.write(f'{model.__name__}: {total} rows in {elapsed:.1f}s '
+                          f'({total / max(elapsed, 1e-9) * 60:,.0f} rows/min)')
+        return list(model.objects.filter(id__gt=start).order_by('id').values_list('id', flat=True))
+
+    def flush(self, model, batch, sql=None):
+        if batch:
+            with transaction.atomic():
+                if sql:
+                    with connection.cursor() as cursor:
+                        cursor.executemany(sql, batch)
+                else:
+                    model.objects.bulk_create(batch)
+        return len(batch)
+
+    @staticmethod
+    def insert_sql(model, fields):
+        quote = connection.ops.quote_name
+        columns = [model._meta.get_field(name).column for name in fields]
+        return 'INSERT INTO {} ({}) VALUES ({})'.format(
+            quote(model._meta.db_table),
+            ', '.join(quote(column) for column in columns),
+            ', '.join(['%s'] * len(columns)),
+        )
+
+    def create_users(self, count):
+        # Hashing is deliberately slow, so every seeded user shares one password
+        password = make_password('password123')
+        return self.bulk_create(User, (
+            User(username=f'{self.prefix}_user{i}', email=f'{self.prefix}_user{i}@example.com',
+                 password=password, phone=f'07{self.rng.randrange(10 ** 8):08d}')
+            for i in range(count)
+        ))
+
+    def create_venues(self, count):
+        return self.bulk_create(Venue, (
+            Venue(name=f'{self.prefix} {self.rng.choice(TOWNS)} Hall {i}',
+                  latitude=self.rng.uniform(-4.5, 4.5), longitude=self.rng.uniform(34.0, 41.5))
+            for i in range(count)
+        ))
+
+    def create_events(self, count, venue_ids, registrations, user_count):
+        # Decide up front how many people each event gets so current_attendees matches
+        per_event = registrations / max(count, 1)
+        attendees = [
+            min(int(self.rng.expovariate(1 / per_event)) if per_event else 0, user_count)
+            for _ in range(count)
+        ]
+        scale = registrations / max(sum(attendees), 1)
+        attendees = [min(round(n * scale), user_count) for n in attendees]
+
+        def rows():
+            for i, n in enumerate(attendees):
+                town = self.rng.choice(TOWNS)
+                yield Event(
+                    title=f'{self.rng.choice(["Friday", "Weekend", "Sunset", "Campus"])} '
+                          f'{self.rng.choice(EVENT_TYPES).title()} #{i}',
+                    description='Synthetic event for benchmarking. ' * 4,
+                    event_type=self.rng.choice(EVENT_TYPES),
+                    date=self.now + timedelta(days=self.rng.uniform(-365, 180)),
+                    location=town,
+                    venue_id=self.rng.choice(venue_ids),
+                    max_attendees=n + self.rng.randrange(0, 50) + 1,
+                    current_attendees=n,
+                )
+        return self.bulk_create(Event, rows()), attendees
+
+    def create_registrations(self, event_ids, attendees, user_ids):
+        # Distinct users per event, so unique_together (user, event) always holds.
+        # The hot path inserts tuples; model instances cost more than the INSERT.
+        registered = connection.ops.adapt_datetimefield_value(self.now)
+
+        def rows():
+            for event_id, n in zip(event_ids, attendees):
+                for user_id in self.rng.sample(user_ids, n):
+                    yield user_id, event_id, registered, 'confirmed', ''
+        self.bulk_create(Registration, rows(),
+                         fields=['user', 'event', 'registration_date', 'status', 'special_requests'])
+
+    def create_messages(self, count, user_ids):
+        created = connection.ops.adapt_datetimefield_value(self.now)
+        content = 'Synthetic message body. ' * 5
+
+        def rows():
+            for i in range(count):
+                feedback = self.rng.random() < 0.2
+                yield (self.rng.choice(user_ids), None if feedback else self.rng.choice(user_ids),
+                       f'Message {i}', content, feedback, self.rng.random() < 0.7, created)
+        self.bulk_create(Message, rows(), fields=['sender', 'receiver', 'subject', 'content',
+                                                  'is_feedback', 'is_read', 'created_at'])
+
+    def create_trending(self, event_ids):
+        self.bulk_create(Trending, (
+            Trending(event_id=event_id, views=self.rng.randrange(5000), clicks=self.rng.randrange(1000))
+            for event_id in event_ids
+        ))
+
+
+@contextmanager
+def fast_bulk_load():
+    """Relax durability on SQLite for the duration of the load."""
+    # SQLite refuses to change these inside a transaction
+    if connection.vendor != 'sqlite' or connection.in_atomic_block:
+        yield
+        return
+    with connection.cursor() as cursor:
+        # Put back whatever was set before, e.g. a WAL database stays in WAL
+        cursor.execute('PRAGMA synchronous')
+        synchronous = cursor.fetchone()[0]
+        cursor.execute('PRAGMA journal_mode')
+        journal_mode = cursor.fetchone()[0]
+        cursor.execute('PRAGMA synchronous = OFF')
+        cursor.execute('PRAGMA journal_mode = MEMORY')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA synchronous = {int(synchronous)}')
+            cursor.execute(f'PRAGMA journal_mode = {journal_mode}')
+
+
+@contextmanager
+def deferred_indexes(models):
+    """
+    Drop the plain (non-unique) secondary indexes of `models` while loading
+    and rebuild them once at the end. Unique indexes stay so the database
+    still enforces them.
+    """
+    dropped = []
+    with connection.cursor() as cursor:
+        for model in models:
+            table = model._meta.db_table
+            constraints = connection.introspection.get_constraints(cursor, table)
+            for name, info in constraints.items():
+                if info['index'] and not info['unique'] and not info['primary_key'] and info['columns']:
+                    cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+                    dropped.append((name, table, info['columns']))
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for name, table, columns in dropped:
+                cursor.execute('CREATE INDEX {} ON {} ({})'.format(
+                    connection.ops.quote_name(name),
+                    connection.ops.quote_name(table),
+                    ', '.join(connection.ops.quote_name(column) for column in columns),
+                ))
@@ -0,0 +1,228 @@
+"""
+In-process metrics exported in the Prometheus text format at /metrics.
+
+Each process (e.g. each gunicorn worker) writes its own memory-mapped file in
+METRICS_DIR, so recording a sample is a dict lookup and a struct write under
+an uncontended thread lock, never a DB write. The endpoint sums the files of
+all workers. Clear METRICS_DIR when the server is (re)deployed.
+"""
+import atexit
+import glob
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+from collections import defaultdict
+from django.conf import settings
+
+_HEADER = struct.Struct('i4x')
+_LENGTH = struct.Struct('i')
+_VALUE = struct.Struct('d')
+_INITIAL_SIZE = 1 << 16
+
+
+class MmapedDict:
+    """
+    Append-only {str: float} stored in a file:
+    [used bytes][4 pad] then entries of [key length][key, padded to 8][double].
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a+b')
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.truncate(_INITIAL_SIZE)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self._used = _HEADER.unpack_from(self._mmap, 0)[0] or _HEADER.size
+        self._positions = {key: pos for key, _, pos in self._entries(self._mmap, self._used)}
+
+    @staticmethod
+    def _entries(data, used):
+        pos = _HEADER.size
+        while pos < used:
+            length = _LENGTH.unpack_from(data, pos)[0]
+            key_end = pos + _LENGTH.size + length
+            key = data[pos + _LENGTH.size:key_end].decode('utf-8')
+            value_pos = key_end + (-key_end % 8)
+            yield key, _VALUE.unpack_from(data, value_pos)[0], value_pos
+            pos = value_pos + _VALUE.size
+
+    @classmethod
+    def read(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            return []
+        used = _HEADER.unpack_from(data, 0)[0]
+        return [(key, value) for key, value, _ in cls._entries(data, used)]
+
+    def _add_key(self, key):
+        encoded = key.encode('utf-8')
+        key_end = self._used + _LENGTH.size + len(encoded)
+        value_pos = key_end + (-key_end % 8)
+        end = value_pos + _VALUE.size
+        if end > len(self._mmap):
+            size = len(self._mmap)
+            while end > size:
+                size *= 2
+            self._mmap.close()
+            self._file.truncate(size)
+            self._mmap = mmap.mmap(self._file.fileno(), 0)
+        _LENGTH.pack_into(self._mmap, self._used, len(encoded))
+        self._mmap[self._used + _LENGTH.size:key_end] = encoded
+        _VALUE.pack_into(self._mmap, value_pos, 0.0)
+        # Publish the entry only once it is fully written
+        self._used = end
+        _HEADER.pack_into(self._mmap, 0, self._used)
+        self._positions[key] = value_pos
+        return value_pos
+
+    def inc(self, key, amount):
+        pos = self._positions.get(key)
+        if pos is None:
+            pos = self._add_key(key)
+        _VALUE.pack_into(self._mmap, pos, _VALUE.unpack_from(self._mmap, pos)[0] + amount)
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+
+_lock = threading.Lock()
+_store = None
+_store_key = None
+
+
+def _get_store():
+    global _store, _store_key
+    # Re-open after a fork so every worker gets its own file
+    key = (os.getpid(), str(settings.METRICS_DIR))
+    if _store_key != key:
+        if _store is not None:
+            _store.close()
+        os.makedirs(key[1], exist_ok=True)
+        _store = MmapedDict(os.path.join(key[1], f'metrics_{key[0]}.db'))
+        _store_key = key
+    return _store
+
+
+def close():
+    global _store, _store_key
+    with _lock:
+        if _store is not None:
+            _store.close()
+        _store = _store_key = None
+
+
+atexit.register(close)
+
+
+def _key(sample_name, labels):
+    return json.dumps([sample_name, sorted(labels.items())])
+
+
+REGISTRY = {}
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._keys = {}
+        REGISTRY[name] = self
+
+    def inc(self, amount=1, **labels):
+        label_values = tuple(sorted(labels.items()))
+        key = self._keys.get(label_values)
+        if key is None:
+            key = self._keys[label_values] = _key(self.name + '_total', labels)
+        with _lock:
+            _get_store().inc(key, amount)
+
+
+class Histogram:
+    type = 'histogram'
+    DEFAULT_BUCKETS = (.001, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+
+    def __init__(self, name, documentation, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self._keys = {}
+        REGISTRY[name] = self
+
+    def _keys_for(self, labels):
+        label_values = tuple(sorted(labels.items()))
+        keys = self._keys.get(label_values)
+        if keys is None:
+            bucket_name = self.name + '_bucket'
+            keys = self._keys[label_values] = (
+                [(bound, _key(bucket_name, {**labels, 'le': str(bound)})) for bound in self.buckets]
+                + [(math.inf, _key(bucket_name, {**labels, 'le': '+Inf'}))],
+                _key(self.name + '_sum', labels),
+                _key(self.name + '_count', labels),
+            )
+        return keys
+
+    def observe(self, value, **labels):
+        bucket_keys, sum_key, count_key = self._keys_for(labels)
+        with _lock:
+            store = _get_store()
+            # Buckets are stored cumulatively, as exported; every bucket is
+            # touched so empty ones still show up as 0
+            for bound, key in bucket_keys:
+                store.inc(key, 1 if value <= bound else 0)
+            store.inc(sum_key, value)
+            store.inc(count_key, 1)
+
+
+REQUEST_LATENCY = Histogram('yosa_request_duration_seconds', 'Request latency by view.')
+DB_QUERY_LATENCY = Histogram('yosa_db_query_duration_seconds', 'Database query time by view.')
+REGISTRATIONS = Counter('yosa_event_registrations', 'Event registration attempts by result.')
+TRENDING_WRITES = Counter('yosa_trending_writes', 'Trending row updates by kind.')
+CACHE_REQUESTS = Counter('yosa_cache_requests', 'Cache lookups by cache and result.')
+THROTTLED = Counter('yosa_throttled_requests', 'Requests rejected with 429 by throttle scope.')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _sample_order(item):
+    (sample_name, labels), _ = item
+    labels = dict(labels)
+    le = labels.pop('le', None)
+    bound = math.inf if le in (None, '+Inf') else float(le)
+    return sorted(labels.items()), sample_name, bound
+
+
+def collect():
+    """Sum every worker's file and render the Prometheus text exposition."""
+    totals = defaultdict(float)
+    for path in glob.glob(os.path.join(settings.METRICS_DIR, 'metrics_*.db')):
+        for key, value in MmapedDict.read(path):
+            name, labels = json.loads(key)
+            totals[(name, tuple(map(tuple, labels)))] += value
+
+    lines = []
+    for metric in REGISTRY.values():
+        samples = [
+            item for item in totals.items()
+            if item[0][0] == metric.name + '_total'
+            or item[0][0].rsplit('_', 1)[0] == metric.name
+        ]
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.type}')
+        for (sample_name, labels), value in sorted(samples, key=_sample_order):
+            lines.append(f'{sample_name}{_format_labels(labels)} {value!r}')
+    return '\n'.join(lines) + '\n'
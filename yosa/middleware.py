@@ -0,0 +1,83 @@
+import cProfile
+import os
+import random
+import time
+from django.conf import settings
+from django.db import connection
+from . import metrics
+
+
+class ProfilingMiddleware:
+    """
+    Profile a sample of requests with cProfile and dump the stats to
+    PROFILING_DIR, named after the view. Staff can force a profile by
+    sending the PROFILING_HEADER header. Summarise with `manage.py analyze_profiles`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+        self.header = getattr(settings, 'PROFILING_HEADER', 'X-Profile')
+        self.directory = getattr(settings, 'PROFILING_DIR', None)
+        self.max_files = getattr(settings, 'PROFILING_MAX_FILES', 500)
+
+    def should_profile(self, request):
+        if not self.directory:
+            return False
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        return self.header in request.headers and request.user.is_staff
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        response = profiler.runcall(self.get_response, request)
+
+        match = request.resolver_match
+        view_name = (match.url_name or match.view_name) if match else 'unresolved'
+        self.save(profiler, view_name.replace(':', '-'))
+        return response
+
+    def save(self, profiler, view_name):
+        os.makedirs(self.directory, exist_ok=True)
+        filename = f'{view_name}.{time.time_ns()}.{os.getpid()}.prof'
+        profiler.dump_stats(os.path.join(self.directory, filename))
+
+        # Keep only the newest max_files profiles
+        entries = sorted(os.scandir(self.directory), key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:-self.max_files]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+class MetricsMiddleware:
+    """Record request latency and database time per view into yosa.metrics."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        query_times = []
+
+        def timed_query(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                query_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with connection.execute_wrapper(timed_query):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        match = request.resolver_match
+        view = (match.url_name or match.view_name) if match else 'unresolved'
+        metrics.REQUEST_LATENCY.observe(elapsed, view=view)
+        for duration in query_times:
+            metrics.DB_QUERY_LATENCY.observe(duration, view=view)
+        return response
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('yosa', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarities', to='yosa.event')),
+                ('similar_event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_to', to='yosa.event')),
+            ],
+            options={
+                'unique_together': {('event', 'similar_event')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('yosa', '0004_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyEventStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('party', 'Party'), ('meetup', 'Meetup'), ('game', 'Game Night'), ('other', 'Other')], max_length=20)),
+                ('day', models.DateField()),
+                ('registrations', models.PositiveIntegerField(default=0)),
+                ('cancellations', models.PositiveIntegerField(default=0)),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('clicks', models.PositiveIntegerField(default=0)),
+                ('attendees', models.IntegerField(default=0)),
+                ('capacity', models.IntegerField(default=0)),
+                ('event', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='daily_stats', to='yosa.event')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'event_type'], name='yosa_dailye_day_e353f0_idx')],
+                'unique_together': {('event', 'day')},
+            },
+        ),
+    ]
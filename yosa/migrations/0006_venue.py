@@ -0,0 +1,46 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def venues_from_locations(apps, schema_editor):
+    # One venue per distinct location string; coordinates are filled in
+    # afterwards through the admin
+    Event = apps.get_model('yosa', 'Event')
+    Venue = apps.get_model('yosa', 'Venue')
+    for location in Event.objects.values_list('location', flat=True).distinct():
+        name = location.strip()
+        if not name:
+            continue
+        venue, _ = Venue.objects.get_or_create(name=name)
+        Event.objects.filter(location=location).update(venue=venue)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('yosa', '0005_dailyeventstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Venue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True)),
+                ('address', models.CharField(blank=True, max_length=255)),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['latitude', 'longitude'], name='yosa_venue_latitud_630df0_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='venue',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='events', to='yosa.venue'),
+        ),
+        migrations.RunPython(venues_from_locations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('yosa', '0008_checkin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('event_type', models.CharField(choices=[('party', 'Party'), ('meetup', 'Meetup'), ('game', 'Game Night'), ('other', 'Other')], max_length=20)),
+                ('location', models.CharField(max_length=200)),
+                ('max_attendees', models.IntegerField()),
+                ('image', models.ImageField(blank=True, null=True, upload_to='events/')),
+                ('start', models.DateTimeField(help_text='Date and time of the first occurrence')),
+                ('frequency', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly')], default='weekly', max_length=10)),
+                ('interval', models.PositiveIntegerField(default=1, help_text='Repeat every N days/weeks/months')),
+                ('until', models.DateTimeField(blank=True, help_text='No occurrences after this', null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('venue', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='series', to='yosa.venue')),
+            ],
+            options={
+                'verbose_name_plural': 'event series',
+            },
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='series',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='events', to='yosa.eventseries'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='event',
+            unique_together={('series', 'date')},
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('yosa', '0009_eventseries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedTicket',
+            fields=[
+                ('registration_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('revoked_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='archivedregistration',
+            name='checked_in_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('yosa', '0010_revokedticket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedBroadcastEvent',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('broadcast', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='yosa.broadcast')),
+                ('event', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='yosa.archivedevent')),
+            ],
+        ),
+    ]
@@ -1,3 +1,6 @@
+import calendar
+import math
+from datetime import timedelta
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
@@ -12,6 +15,19 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
 
+class Venue(models.Model):
+    name = models.CharField(max_length=200, unique=True)
+    address = models.CharField(max_length=255, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    
+    class Meta:
+        # Bounding-box lookups for "near me" queries, see yosa.geo
+        indexes = [models.Index(fields=['latitude', 'longitude'])]
+    
+    def __str__(self):
+        return self.name
+
 class Event(models.Model):
     EVENT_TYPES = [
         ('party', 'Party'),
@@ -25,12 +41,17 @@ class Event(models.Model):
     event_type = models.CharField(max_length=20, choices=EVENT_TYPES)
     date = models.DateTimeField()
     location = models.CharField(max_length=200)
+    venue = models.ForeignKey(Venue, on_delete=models.SET_NULL, null=True, blank=True, related_name='events')
+    series = models.ForeignKey('EventSeries', on_delete=models.SET_NULL, null=True, blank=True, related_name='events')
     max_attendees = models.IntegerField()
     current_attendees = models.IntegerField(default=0)
     image = models.ImageField(upload_to='events/', blank=True, null=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        unique_together = ['series', 'date']
+    
     def __str__(self):
         return self.title
     
@@ -40,6 +61,87 @@ class Event(models.Model):
     def seats_left(self):
         return self.max_attendees - self.current_attendees
 
+def add_months(value, months):
+    month = value.month - 1 + months
+    year, month = value.year + month // 12, month % 12 + 1
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+class EventSeries(models.Model):
+    # A recurring event. Concrete Event rows are only created for the next
+    # few weeks (`manage.py materialize_series`) or on first registration;
+    # listings expand later occurrences from the rule on the fly.
+    FREQUENCIES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+    ]
+    
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    event_type = models.CharField(max_length=20, choices=Event.EVENT_TYPES)
+    location = models.CharField(max_length=200)
+    venue = models.ForeignKey(Venue, on_delete=models.SET_NULL, null=True, blank=True, related_name='series')
+    max_attendees = models.IntegerField()
+    image = models.ImageField(upload_to='events/', blank=True, null=True)
+    start = models.DateTimeField(help_text="Date and time of the first occurrence")
+    frequency = models.CharField(max_length=10, choices=FREQUENCIES, default='weekly')
+    interval = models.PositiveIntegerField(default=1, help_text="Repeat every N days/weeks/months")
+    until = models.DateTimeField(null=True, blank=True, help_text="No occurrences after this")
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name_plural = 'event series'
+    
+    def __str__(self):
+        return f"{self.title} ({self.get_frequency_display().lower()})"
+    
+    def nth_occurrence(self, n):
+        if self.frequency == 'monthly':
+            return add_months(self.start, n * self.interval)
+        step = timedelta(days=self.interval) if self.frequency == 'daily' else timedelta(weeks=self.interval)
+        return self.start + n * step
+    
+    def occurrences(self, after, before):
+        """Yield occurrence datetimes in [after, before), in order."""
+        if self.frequency == 'monthly':
+            months = (after.year - self.start.year) * 12 + after.month - self.start.month
+            n = max(months // self.interval - 1, 0)
+        else:
+            step = timedelta(days=self.interval) if self.frequency == 'daily' else timedelta(weeks=self.interval)
+            n = max(math.ceil((after - self.start) / step), 0)
+        while True:
+            date = self.nth_occurrence(n)
+            if date >= before or (self.until and date > self.until):
+                return
+            if date >= after:
+                yield date
+            n += 1
+    
+    def is_occurrence(self, date):
+        return any(True for _ in self.occurrences(date, date + timedelta(seconds=1)))
+    
+    def build_occurrence(self, date):
+        return Event(
+            series=self,
+            title=self.title,
+            description=self.description,
+            event_type=self.event_type,
+            date=date,
+            location=self.location,
+            venue=self.venue,
+            max_attendees=self.max_attendees,
+            image=self.image,
+        )
+    
+    def materialize(self, date):
+        event = self.build_occurrence(date)
+        defaults = {f.attname: getattr(event, f.attname) for f in Event._meta.concrete_fields
+                    if f.attname not in ('id', 'series_id', 'date', 'created_at')}
+        event, _ = Event.objects.get_or_create(series=self, date=date, defaults=defaults)
+        return event
+
 class Registration(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
@@ -70,6 +172,51 @@ class Message(models.Model):
     def __str__(self):
         return f"{self.subject} - {self.sender.username}"
 
+class Broadcast(models.Model):
+    # Fan-out-on-read: one row per broadcast, recipients are whoever held a
+    # confirmed registration for one of `events` when it was sent
+    is_broadcast = True
+    
+    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='broadcasts')
+    events = models.ManyToManyField(Event, related_name='broadcasts')
+    subject = models.CharField(max_length=200)
+    content = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    def __str__(self):
+        return f"{self.subject} - {self.sender.username}"
+    
+    @classmethod
+    def for_user(cls, user):
+        # Events archived since the broadcast are matched through the archive
+        archived = ArchivedBroadcastEvent.objects.filter(models.Exists(
+            ArchivedRegistration.objects.filter(
+                user=user,
+                status='confirmed',
+                event_id=models.OuterRef('event_id'),
+                registration_date__lte=models.OuterRef('broadcast__created_at'),
+            )
+        )).values('broadcast_id')
+        return cls.objects.filter(
+            models.Q(
+                events__registration__user=user,
+                events__registration__status='confirmed',
+                events__registration__registration_date__lte=models.F('created_at'),
+            ) | models.Q(pk__in=archived)
+        ).distinct()
+
+class BroadcastReceipt(models.Model):
+    # Created the first time a recipient sees the broadcast
+    broadcast = models.ForeignKey(Broadcast, on_delete=models.CASCADE, related_name='receipts')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    read_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['broadcast', 'user']
+    
+    def __str__(self):
+        return f"{self.user.username} read {self.broadcast.subject}"
+
 class Trending(models.Model):
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
     views = models.IntegerField(default=0)
@@ -78,3 +225,142 @@ class Trending(models.Model):
     
     def __str__(self):
         return f"{self.event.title} - {self.views} views"
+
+class EventSimilarity(models.Model):
+    # Precomputed item-item similarity, rebuilt by `manage.py build_recommendations`
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='similarities')
+    similar_event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='similar_to')
+    score = models.FloatField()
+    
+    class Meta:
+        unique_together = ['event', 'similar_event']
+    
+    def __str__(self):
+        return f"{self.event.title} -> {self.similar_event.title} ({self.score:.3f})"
+
+class Friendship(models.Model):
+    # Stored as two rows (a -> b and b -> a); use friends.add_friend/remove_friend
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='friendships')
+    friend = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['user', 'friend']
+    
+    def __str__(self):
+        return f"{self.user.username} -> {self.friend.username}"
+
+class FriendsAttending(models.Model):
+    # How many of `user`'s friends hold a confirmed registration for `event`
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='+')
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['user', 'event']
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.event.title}: {self.count}"
+
+# Archive tables, filled by `manage.py archive_old_data`. Rows keep their
+# original primary keys so links between archived objects still resolve.
+
+class ArchivedEvent(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    event_type = models.CharField(max_length=20, choices=Event.EVENT_TYPES)
+    date = models.DateTimeField(db_index=True)
+    location = models.CharField(max_length=200)
+    max_attendees = models.IntegerField()
+    current_attendees = models.IntegerField(default=0)
+    image = models.ImageField(upload_to='events/', blank=True, null=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return self.title
+
+class ArchivedRegistration(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    # Cancelled registrations are archived before their event is, so this
+    # may point at an event that is still in the hot table
+    event = models.ForeignKey(ArchivedEvent, on_delete=models.DO_NOTHING,
+                              db_constraint=False, related_name='registrations')
+    registration_date = models.DateTimeField()
+    status = models.CharField(max_length=20)
+    special_requests = models.TextField(blank=True)
+    # From the CheckIn row, which is deleted along with the registration
+    checked_in_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.event_id}"
+
+class RevokedTicket(models.Model):
+    # Tombstone for a deleted registration, so its ticket stays revoked in
+    # every process's Bloom filter (see yosa.tickets)
+    registration_id = models.BigIntegerField(primary_key=True)
+    revoked_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.registration_id} revoked at {self.revoked_at}"
+
+class ArchivedBroadcastEvent(models.Model):
+    # Broadcast.events link rows of archived events, so their attendees
+    # still see the broadcast
+    id = models.BigIntegerField(primary_key=True)
+    broadcast = models.ForeignKey(Broadcast, on_delete=models.CASCADE, related_name='+')
+    event = models.ForeignKey(ArchivedEvent, on_delete=models.DO_NOTHING,
+                              db_constraint=False, related_name='+')
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.broadcast_id} - {self.event_id}"
+
+class ArchivedMessage(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    receiver = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', null=True, blank=True)
+    subject = models.CharField(max_length=200)
+    content = models.TextField()
+    is_feedback = models.BooleanField(default=False)
+    is_read = models.BooleanField(default=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return self.subject
+
+class DailyEventStats(models.Model):
+    # One row per event per day, maintained by yosa.analytics. No database
+    # constraint on event so history survives archive_old_data.
+    event = models.ForeignKey(Event, on_delete=models.DO_NOTHING, db_constraint=False,
+                              related_name='daily_stats')
+    event_type = models.CharField(max_length=20, choices=Event.EVENT_TYPES)
+    day = models.DateField()
+    registrations = models.PositiveIntegerField(default=0)
+    cancellations = models.PositiveIntegerField(default=0)
+    views = models.PositiveIntegerField(default=0)
+    clicks = models.PositiveIntegerField(default=0)
+    attendees = models.IntegerField(default=0)
+    capacity = models.IntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['event', 'day']
+        indexes = [models.Index(fields=['day', 'event_type'])]
+    
+    def __str__(self):
+        return f"{self.event_id} - {self.day}"
+
+class CheckIn(models.Model):
+    # Written in batches by yosa.tickets.CheckInRecorder
+    registration = models.OneToOneField(Registration, on_delete=models.CASCADE, related_name='check_in')
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='check_ins')
+    checked_in_at = models.DateTimeField(default=timezone.now)
+    checked_in_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    
+    def __str__(self):
+        return f"{self.registration_id} at {self.checked_in_at}"
@@ -0,0 +1,38 @@
+import heapq
+import math
+from collections import defaultdict
+from itertools import groupby
+from operator import itemgetter
+
+
+def build_similarity(pairs, top_k=10):
+    """
+    Item-item cosine similarity over the user x event co-registration matrix.
+
+    `pairs` is an iterable of (user_id, event_id) sorted by user_id, so each
+    user's row is processed as one batch and the matrix is never materialised.
+    Returns {event_id: [(score, similar_event_id), ...]} with the top_k
+    neighbours of each event, best first.
+    """
+    event_counts = defaultdict(int)
+    co_counts = defaultdict(int)
+
+    for _, row in groupby(pairs, key=itemgetter(0)):
+        events = sorted({event_id for _, event_id in row})
+        for event_id in events:
+            event_counts[event_id] += 1
+        for i, a in enumerate(events):
+            for b in events[i + 1:]:
+                co_counts[(a, b)] += 1
+
+    neighbours = defaultdict(list)
+    for (a, b), co in co_counts.items():
+        score = co / math.sqrt(event_counts[a] * event_counts[b])
+        for event_id, other in ((a, b), (b, a)):
+            heap = neighbours[event_id]
+            if len(heap) < top_k:
+                heapq.heappush(heap, (score, other))
+            elif score > heap[0][0]:
+                heapq.heapreplace(heap, (score, other))
+
+    return {event_id: sorted(heap, reverse=True) for event_id, heap in neighbours.items()}
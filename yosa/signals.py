@@ -0,0 +1,49 @@
+from django.core.cache import cache
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from . import analytics, friends, tickets
+from .backends import invalidate_cached_user
+from .live import publisher
+from .models import User, Event, EventSeries, Registration
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_cached_user(sender, instance, **kwargs):
+    # Covers update_profile, set_password() + save() and last_login updates
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(post_init, sender=Registration)
+def remember_registration_status(sender, instance, **kwargs):
+    # Read through __dict__ so a deferred status doesn't cost a query
+    instance._was_confirmed = instance.pk is not None and instance.__dict__.get('status') == 'confirmed'
+
+
+@receiver(post_save, sender=Registration)
+def registration_saved(sender, instance, **kwargs):
+    is_confirmed = instance.status == 'confirmed'
+    friends.registration_changed(instance, instance._was_confirmed, is_confirmed)
+    analytics.registration_changed(instance, instance._was_confirmed, is_confirmed)
+    if instance._was_confirmed and not is_confirmed:
+        tickets.revoke(instance.pk)
+    instance._was_confirmed = is_confirmed
+
+
+@receiver(post_delete, sender=Registration)
+def registration_deleted(sender, instance, **kwargs):
+    # Deletions are archival or cleanup, not cancellations, so the rollups are left alone
+    friends.registration_changed(instance, instance._was_confirmed, False)
+    tickets.revoke(instance.pk, deleted=True)
+
+
+@receiver(post_save, sender=Event)
+def refresh_attendance_snapshot(sender, instance, **kwargs):
+    analytics.update_daily_stats(instance)
+    publisher.publish(instance.pk, instance.current_attendees, instance.max_attendees)
+
+
+@receiver(post_save, sender=EventSeries)
+@receiver(post_delete, sender=EventSeries)
+def drop_cached_series(sender, **kwargs):
+    cache.delete('yosa:active_series')
@@ -0,0 +1,20 @@
+import shutil
+import tempfile
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from . import metrics
+
+
+class TestRunner(DiscoverRunner):
+    """Keep the metrics files written during the test run out of METRICS_DIR."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.metrics_dir = tempfile.mkdtemp(prefix='yosa-metrics-')
+        self.saved_metrics_dir, settings.METRICS_DIR = settings.METRICS_DIR, self.metrics_dir
+
+    def teardown_test_environment(self, **kwargs):
+        metrics.close()
+        settings.METRICS_DIR = self.saved_metrics_dir
+        shutil.rmtree(self.metrics_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
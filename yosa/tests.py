@@ -1,3 +1,732 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+import threading
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.contrib.sessions.models import Session
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from .models import (User, Venue, Event, EventSeries, Registration, Message, FriendsAttending,
+                     ArchivedEvent, ArchivedRegistration, ArchivedMessage, DailyEventStats, Trending,
+                     Broadcast, BroadcastReceipt, CheckIn)
+from .friends import add_friend, remove_friend, rebuild_friends_attending
+from .recommendations import build_similarity
+from .geo import haversine_km
+from .metrics import MmapedDict
+from . import live, tickets
+from .throttle import TokenBuckets, buckets
+from .live import SeatPublisher
 
-# Create your tests here.
+
+class CachedAuthTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('amani', password='pass12345', email='amani@example.com')
+        self.client.force_login(self.user)
+
+    def test_warm_cache_has_no_auth_overhead(self):
+        # First request warms the User cache
+        self.client.get(reverse('profile'))
+        # Only the view's own registration count should hit the database
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('profile'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_update_profile_invalidates_cached_user(self):
+        self.client.get(reverse('profile'))
+        self.client.post(reverse('update_profile'), {
+            'first_name': 'Amani',
+            'last_name': '',
+            'email': 'amani@example.com',
+            'phone': '0700000000',
+            'bio': '',
+        })
+        response = self.client.get(reverse('profile'))
+        self.assertEqual(response.context['user'].phone, '0700000000')
+
+    def test_password_change_logs_out_other_sessions(self):
+        self.client.get(reverse('profile'))
+        self.user.set_password('newpass12345')
+        self.user.save()
+        response = self.client.get(reverse('profile'))
+        self.assertEqual(response.status_code, 302)
+
+
+class PurgeSessionsTests(TestCase):
+    def test_only_expired_sessions_are_removed(self):
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(session_key=f'old{i}', session_data='', expire_date=now - timedelta(days=1))
+        Session.objects.create(session_key='live', session_data='', expire_date=now + timedelta(days=1))
+
+        call_command('purge_sessions', chunk_size=2, stdout=StringIO())
+
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['live'])
+
+
+class RecommendationTests(TestCase):
+    def test_build_similarity_ranks_co_registered_events(self):
+        pairs = [(1, 10), (1, 20), (2, 10), (2, 20), (3, 10), (3, 30)]
+        neighbours = build_similarity(pairs, top_k=1)
+        self.assertEqual(neighbours[10][0][1], 20)
+        self.assertEqual(len(neighbours[10]), 1)
+
+    def test_dashboard_suggests_similar_events(self):
+        cache.clear()
+        user = User.objects.create_user('wanjiku', password='pass12345')
+        date = timezone.now() + timedelta(days=7)
+        attended, similar, unrelated = [
+            Event.objects.create(title=title, description='', event_type='party',
+                                 date=date + timedelta(hours=i), location='Kisii', max_attendees=50)
+            for i, title in enumerate(['Attended', 'Similar', 'Unrelated'])
+        ]
+        other = User.objects.create_user('otieno', password='pass12345')
+        Registration.objects.create(user=user, event=attended)
+        Registration.objects.create(user=other, event=attended)
+        Registration.objects.create(user=other, event=similar)
+
+        call_command('build_recommendations', stdout=StringIO())
+
+        self.client.force_login(user)
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(list(response.context['upcoming_events']), [similar])
+
+
+class FriendsAttendingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user('alice', password='pass12345')
+        self.bob = User.objects.create_user('bob', password='pass12345')
+        self.event = Event.objects.create(title='Game Night', description='', event_type='game',
+                                          date=timezone.now() + timedelta(days=3),
+                                          location='Kisii', max_attendees=20)
+
+    def count_for(self, user):
+        row = FriendsAttending.objects.filter(user=user, event=self.event).first()
+        return row.count if row else 0
+
+    def test_counts_follow_registrations_and_friendships(self):
+        registration = Registration.objects.create(user=self.bob, event=self.event)
+        add_friend(self.alice, self.bob)
+        self.assertEqual(self.count_for(self.alice), 1)
+        self.assertEqual(self.count_for(self.bob), 0)
+
+        registration.status = 'cancelled'
+        registration.save()
+        self.assertEqual(self.count_for(self.alice), 0)
+
+        registration.status = 'confirmed'
+        registration.save()
+        Registration.objects.create(user=self.alice, event=self.event)
+        self.assertEqual(self.count_for(self.bob), 1)
+
+        remove_friend(self.bob, self.alice)
+        self.assertEqual(self.count_for(self.alice), 0)
+        self.assertEqual(self.count_for(self.bob), 0)
+
+    def test_rebuild_matches_incremental_counts(self):
+        add_friend(self.alice, self.bob)
+        Registration.objects.create(user=self.bob, event=self.event)
+        rebuild_friends_attending()
+        self.assertEqual(self.count_for(self.alice), 1)
+
+    def test_events_list_shows_counts_in_one_query(self):
+        add_friend(self.alice, self.bob)
+        Registration.objects.create(user=self.bob, event=self.event)
+        self.client.force_login(self.alice)
+        self.client.get(reverse('events'))
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('events'))
+        self.assertContains(response, '1 attending')
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('kerubo', password='pass12345')
+        now = timezone.now()
+        self.old_events = [
+            Event.objects.create(title=f'Old {i}', description='', event_type='party',
+                                 date=now - timedelta(days=200 + i), location='Kisii', max_attendees=10)
+            for i in range(3)
+        ]
+        self.recent = Event.objects.create(title='Recent', description='', event_type='meetup',
+                                           date=now - timedelta(days=2), location='Kisii', max_attendees=10)
+        self.upcoming = Event.objects.create(title='Upcoming', description='', event_type='game',
+                                             date=now + timedelta(days=2), location='Kisii', max_attendees=10)
+        for event in self.old_events + [self.recent]:
+            Registration.objects.create(user=self.user, event=event)
+        Registration.objects.create(user=self.user, event=self.upcoming, status='cancelled')
+        Message.objects.create(sender=self.user, subject='Old', content='', is_read=True)
+        Message.objects.filter(subject='Old').update(created_at=now - timedelta(days=400))
+        Message.objects.create(sender=self.user, subject='Unread', content='')
+
+    def test_archive_moves_cold_rows_in_chunks(self):
+        call_command('archive_old_data', chunk_size=2, stdout=StringIO())
+
+        self.assertEqual(set(Event.objects.values_list('title', flat=True)), {'Recent', 'Upcoming'})
+        self.assertEqual(ArchivedEvent.objects.count(), 3)
+        self.assertEqual(Registration.objects.count(), 1)
+        self.assertEqual(ArchivedRegistration.objects.count(), 4)
+        self.assertEqual(list(Message.objects.values_list('subject', flat=True)), ['Unread'])
+        self.assertEqual(ArchivedMessage.objects.get().subject, 'Old')
+
+    def test_check_ins_survive_archival(self):
+        registration = Registration.objects.get(event=self.old_events[0])
+        CheckIn.objects.create(registration=registration, event=self.old_events[0])
+        call_command('archive_old_data', stdout=StringIO())
+        self.assertIsNotNone(ArchivedRegistration.objects.get(pk=registration.pk).checked_in_at)
+        self.assertEqual(ArchivedRegistration.objects.filter(checked_in_at__isnull=False).count(), 1)
+
+    def test_past_events_reads_the_archive(self):
+        call_command('archive_old_data', stdout=StringIO())
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('past_events'))
+        titles = [r.event.title for r in response.context['past_registrations']]
+        self.assertEqual(titles, ['Recent', 'Old 0', 'Old 1', 'Old 2'])
+        self.assertEqual(len(response.context['all_past_events']), 4)
+
+
+class MediaServingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        with open(f'{self.media_root}/poster.png', 'wb') as f:
+            f.write(bytes(range(256)) * 4)
+        self.user = User.objects.create_user('nyaboke', password='pass12345')
+        self.client.force_login(self.user)
+        self.url = '/media/poster.png'
+
+    def test_full_response_sends_validators(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(b''.join(response.streaming_content)), 1024)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_range_request(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/1024')
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(10, 20)))
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-4')
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(252, 256)))
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=5000-')
+        self.assertEqual(response.status_code, 416)
+
+    def test_front_server_delegation(self):
+        with self.settings(MEDIA_X_ACCEL_REDIRECT_PREFIX='/protected-media/'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/poster.png')
+        self.assertEqual(response.content, b'')
+
+        with self.settings(MEDIA_X_SENDFILE=True):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Sendfile'], f'{self.media_root}/poster.png')
+
+    def test_permissions_and_paths(self):
+        self.assertEqual(self.client.get('/media/../settings.py').status_code, 404)
+        self.assertEqual(self.client.get('/media/missing.png').status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+
+class AnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user('admin', password='pass12345', is_staff=True)
+        self.event = Event.objects.create(title='Meetup', description='', event_type='meetup',
+                                          date=timezone.now() + timedelta(days=5),
+                                          location='Kisii', max_attendees=4)
+
+    def test_rollups_follow_registrations(self):
+        registration = Registration.objects.create(user=self.staff, event=self.event)
+        registration.status = 'cancelled'
+        registration.save()
+        row = DailyEventStats.objects.get(event=self.event)
+        self.assertEqual((row.registrations, row.cancellations, row.capacity), (1, 1, 4))
+
+    def test_catch_up_books_trending_totals_once(self):
+        Trending.objects.create(event=self.event, views=7, clicks=3)
+        call_command('rollup_stats', stdout=StringIO())
+        call_command('rollup_stats', stdout=StringIO())
+        row = DailyEventStats.objects.get(event=self.event)
+        self.assertEqual((row.views, row.clicks), (7, 3))
+
+    def test_catch_up_keeps_past_attendance_snapshots(self):
+        yesterday = timezone.localdate() - timedelta(days=1)
+        DailyEventStats.objects.create(event=self.event, event_type='meetup', day=yesterday,
+                                       attendees=3, capacity=4)
+        registration = Registration.objects.create(user=self.staff, event=self.event)
+        Registration.objects.filter(pk=registration.pk).update(
+            registration_date=timezone.now() - timedelta(days=1))
+        Event.objects.filter(pk=self.event.pk).update(current_attendees=4, max_attendees=9)
+        call_command('rollup_stats', stdout=StringIO())
+        row = DailyEventStats.objects.get(event=self.event, day=yesterday)
+        self.assertEqual((row.registrations, row.attendees, row.capacity), (1, 3, 4))
+        today = DailyEventStats.objects.get(event=self.event, day=timezone.localdate())
+        self.assertEqual((today.attendees, today.capacity), (4, 9))
+
+    def test_chart_reads_only_rollups(self):
+        Registration.objects.create(user=self.staff, event=self.event)
+        self.client.force_login(self.staff)
+        self.client.get(reverse('analytics'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('analytics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['daily'][0]['registrations'], 1)
+        by_type = response.context['daily_by_type'][0]
+        self.assertEqual(by_type['counts'][response.context['type_labels'].index('Meetup')], 1)
+        self.assertEqual(response.context['by_event'][0]['title'], 'Meetup')
+        self.assertFalse([q for q in queries if 'yosa_registration' in q['sql']])
+
+
+class NearMeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('moraa', password='pass12345')
+        date = timezone.now() + timedelta(days=1)
+        places = [('Kisii Town', -0.6817, 34.7667), ('Nyamira', -0.5633, 34.9358), ('Nairobi', -1.2921, 36.8219)]
+        for name, lat, lng in places:
+            venue = Venue.objects.create(name=name, latitude=lat, longitude=lng)
+            Event.objects.create(title=f'Party in {name}', description='', event_type='party', date=date,
+                                 location=name, venue=venue, max_attendees=10)
+        self.client.force_login(self.user)
+
+    def test_haversine(self):
+        self.assertAlmostEqual(haversine_km(-0.6817, 34.7667, -1.2921, 36.8219), 238, delta=2)
+
+    def test_events_near_me_are_filtered_and_sorted(self):
+        response = self.client.get(reverse('events'), {'lat': -0.6, 'lng': 34.8, 'radius': 50})
+        titles = [event.title for event in response.context['events']]
+        self.assertEqual(titles, ['Party in Kisii Town', 'Party in Nyamira'])
+        self.assertContains(response, 'km away')
+
+    def test_invalid_coordinates_fall_back_to_the_full_list(self):
+        for params in [{'lat': 'inf', 'lng': 0}, {'lat': 'nan', 'lng': 0}, {'lat': 95, 'lng': 0},
+                       {'lat': 0, 'lng': 200}, {'lat': 0, 'lng': 0, 'radius': -5}, {'lat': 0, 'lng': 0, 'radius': 'nan'}]:
+            response = self.client.get(reverse('events'), params)
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(response.context['near_me'])
+            self.assertEqual(len(response.context['events']), 3)
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+
+    def test_staff_header_profiles_request(self):
+        staff = User.objects.create_user('staff', password='pass12345', is_staff=True)
+        member = User.objects.create_user('member', password='pass12345')
+        with self.settings(PROFILING_DIR=self.profile_dir, PROFILING_MAX_FILES=2):
+            self.client.force_login(member)
+            self.client.get(reverse('profile'), HTTP_X_PROFILE='1')
+            self.assertEqual(os.listdir(self.profile_dir), [])
+
+            self.client.force_login(staff)
+            for _ in range(3):
+                self.client.get(reverse('profile'), HTTP_X_PROFILE='1')
+        files = os.listdir(self.profile_dir)
+        self.assertEqual(len(files), 2)
+        self.assertTrue(all(name.startswith('profile.') for name in files))
+
+        out = StringIO()
+        call_command('analyze_profiles', dir=self.profile_dir, limit=5, stdout=out)
+        self.assertIn('profile (2 requests)', out.getvalue())
+        self.assertIn('cumulative', out.getvalue())
+
+
+class SeedDataTests(TestCase):
+    def test_seed_is_consistent(self):
+        call_command('seed_data', users=50, events=10, registrations=200, messages=20,
+                     batch_size=37, stdout=StringIO())
+        self.assertEqual(User.objects.count(), 50)
+        self.assertEqual(Event.objects.count(), 10)
+        self.assertEqual(Message.objects.count(), 20)
+        self.assertEqual(Trending.objects.count(), 10)
+        self.assertAlmostEqual(Registration.objects.count(), 200, delta=10)
+        for event in Event.objects.annotate(n=Count('registration')):
+            self.assertEqual(event.current_attendees, event.n)
+            self.assertLessEqual(event.current_attendees, event.max_attendees)
+        # Secondary indexes are rebuilt after the load
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, 'yosa_registration')
+        self.assertTrue(any(c['columns'] == ['event_id'] and c['index'] for c in constraints.values()))
+
+    def test_same_seed_twice_is_refused(self):
+        call_command('seed_data', users=5, events=2, registrations=4, messages=2, stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('seed_data', users=5, events=2, registrations=4, messages=2, stdout=StringIO())
+        call_command('seed_data', seed=7, users=5, events=2, registrations=4, messages=2, stdout=StringIO())
+        self.assertEqual(User.objects.count(), 10)
+
+
+class BroadcastTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user('organiser', password='pass12345', is_staff=True)
+        self.event = Event.objects.create(title='Sunset Party', description='', event_type='party',
+                                          date=timezone.now() + timedelta(days=2),
+                                          location='Kisii', max_attendees=500)
+        self.attendees = [User.objects.create(username=f'guest{i}') for i in range(30)]
+        for attendee in self.attendees:
+            Registration.objects.create(user=attendee, event=self.event)
+
+    def test_broadcast_writes_do_not_grow_with_attendees(self):
+        self.client.force_login(self.staff)
+        self.client.get(reverse('profile'))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse('send_broadcast'), {
+                'events': [self.event.pk], 'subject': 'Venue change', 'content': 'Moved to the rooftop.',
+            })
+        writes = [q for q in queries if q['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        self.assertLessEqual(len(writes), 3)
+        self.assertEqual(BroadcastReceipt.objects.count(), 0)
+
+    def test_attendees_see_broadcast_and_get_a_receipt(self):
+        broadcast = Broadcast.objects.create(sender=self.staff, subject='Venue change', content='Rooftop')
+        broadcast.events.add(self.event)
+        late = User.objects.create_user('late', password='pass12345')
+        Registration.objects.create(user=late, event=self.event)
+
+        self.client.force_login(self.attendees[0])
+        response = self.client.get(reverse('messages'))
+        self.assertContains(response, 'Venue change')
+        self.assertTrue(BroadcastReceipt.objects.filter(user=self.attendees[0]).exists())
+        self.assertEqual(BroadcastReceipt.objects.count(), 1)
+
+        self.client.force_login(late)
+        self.assertNotContains(self.client.get(reverse('messages')), 'Venue change')
+
+    def test_broadcasts_survive_archival(self):
+        broadcast = Broadcast.objects.create(sender=self.staff, subject='BCAST', content='Thanks for coming')
+        broadcast.events.add(self.event)
+        Event.objects.filter(pk=self.event.pk).update(date=timezone.now() - timedelta(days=400))
+        call_command('archive_old_data', stdout=StringIO())
+        self.assertFalse(Event.objects.filter(pk=self.event.pk).exists())
+        self.assertEqual(list(Broadcast.for_user(self.attendees[0])), [broadcast])
+        self.assertFalse(Broadcast.for_user(self.staff).exists())
+
+    def test_inbox_links_render(self):
+        message = Message.objects.create(sender=self.staff, receiver=self.attendees[0],
+                                         subject='Hello', content='See you there')
+        self.client.force_login(self.attendees[0])
+        self.assertContains(self.client.get(reverse('message_detail', args=[message.pk])), 'See you there')
+        self.assertEqual(self.client.get(reverse('send_message')).status_code, 200)
+        self.client.post(reverse('send_message'), {'receiver': self.staff.pk, 'subject': 'Re: Hello',
+                                                   'content': 'Thanks'})
+        self.assertTrue(Message.objects.filter(receiver=self.staff, subject='Re: Hello').exists())
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.metrics_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.metrics_dir)
+        override = override_settings(METRICS_DIR=self.metrics_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_mmaped_dict_grows_and_reads_back(self):
+        path = os.path.join(self.metrics_dir, 'metrics_test.db')
+        store = MmapedDict(path)
+        for i in range(5000):
+            store.inc(f'key-{i}', i)
+        store.inc('key-7', 0.5)
+        values = dict(MmapedDict.read(path))
+        self.assertEqual(len(values), 5000)
+        self.assertEqual(values['key-7'], 7.5)
+        self.assertEqual(dict(MmapedDict(path)._positions).keys(), values.keys())
+
+    def test_metrics_endpoint(self):
+        staff = User.objects.create_user('ops', password='pass12345', is_staff=True)
+        event = Event.objects.create(title='Tiny', description='', event_type='meetup',
+                                     date=timezone.now() + timedelta(days=1), location='Kisii', max_attendees=1)
+        self.client.force_login(staff)
+        self.client.post(reverse('register_event', args=[event.pk]), {'special_requests': ''})
+        other = User.objects.create(username='other')
+        self.client.force_login(other)
+        self.client.post(reverse('register_event', args=[event.pk]), {'special_requests': ''})
+
+        self.client.force_login(staff)
+        self.client.get(reverse('profile'))
+        response = self.client.get('/metrics')
+        body = response.content.decode()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('# TYPE yosa_request_duration_seconds histogram', body)
+        self.assertIn('yosa_event_registrations_total{result="success"} 1.0', body)
+        self.assertIn('yosa_event_registrations_total{result="full"} 1.0', body)
+        self.assertIn('yosa_request_duration_seconds_count{view="register_event"} 2.0', body)
+        self.assertIn('yosa_db_query_duration_seconds_bucket{le="+Inf",view="register_event"}', body)
+        self.assertIn('yosa_cache_requests_total{cache="user",result=', body)
+        self.assertIn('yosa_cache_requests_total{cache="session",result="hit"}', body)
+        self.assertIn('yosa_cache_requests_total{cache="template_fragment",result=', body)
+
+        self.client.force_login(other)
+        self.assertEqual(self.client.get('/metrics').status_code, 302)
+
+
+class TicketTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tickets.recorder.seen.clear()
+        tickets._revocations = None
+        self.addCleanup(tickets.recorder.flush)
+        self.staff = User.objects.create_user('door', password='pass12345', is_staff=True)
+        self.event = Event.objects.create(title='Gala', description='', event_type='party',
+                                          date=timezone.now() + timedelta(days=1),
+                                          location='Kisii', max_attendees=100)
+        self.guests = [User.objects.create(username=f'guest{i}') for i in range(3)]
+        self.registrations = [Registration.objects.create(user=guest, event=self.event)
+                              for guest in self.guests]
+        self.tokens = [tickets.ticket_token(r) for r in self.registrations]
+
+    def test_bloom_filter(self):
+        bloom = tickets.BloomFilter(capacity=1000)
+        for i in range(1000):
+            bloom.add(i)
+        self.assertTrue(all(i in bloom for i in range(1000)))
+        false_positives = sum(i in bloom for i in range(1000, 11000))
+        self.assertLess(false_positives, 50)
+
+    def test_valid_tickets_check_in_without_db_reads(self):
+        tickets.preload_revocations()
+        recorder = tickets.CheckInRecorder(batch_size=10, max_delay=60)
+        with self.assertNumQueries(0):
+            results = [tickets.check_in(token, event_id=self.event.pk, recorder=recorder)[0]
+                       for token in self.tokens]
+            results.append(tickets.check_in(self.tokens[0], recorder=recorder)[0])
+            results.append(tickets.check_in(self.tokens[1][:-1] + 'x', recorder=recorder)[0])
+            results.append(tickets.check_in(self.tokens[1], event_id=self.event.pk + 1, recorder=recorder)[0])
+        self.assertEqual(results, ['ok', 'ok', 'ok', 'duplicate', 'invalid', 'wrong_event'])
+        self.assertEqual(recorder.flush(), 3)
+        self.assertEqual(CheckIn.objects.count(), 3)
+
+    def test_cancelled_tickets_are_revoked(self):
+        self.registrations[0].status = 'cancelled'
+        self.registrations[0].save()
+        out = StringIO()
+        call_command('checkin_tickets', *self.tokens, event=self.event.pk, stdout=out)
+        self.assertIn('(2 ok, 1 revoked)', out.getvalue())
+        self.assertEqual(CheckIn.objects.count(), 2)
+
+    def test_deleted_registrations_are_revoked_and_dropped_from_batches(self):
+        tickets.preload_revocations()
+        recorder = tickets.CheckInRecorder(batch_size=10, max_delay=60)
+        self.assertTrue(recorder.record(self.registrations[0].pk, self.event.pk))
+        self.assertTrue(recorder.record(self.registrations[1].pk, self.event.pk))
+        self.registrations[0].delete()
+        self.assertEqual(tickets.check_in(self.tokens[0], recorder=recorder)[0], 'revoked')
+        # Still revoked once the filter is rebuilt, as in any other worker
+        tickets.preload_revocations()
+        self.assertEqual(tickets.check_in(self.tokens[0], recorder=tickets.CheckInRecorder())[0], 'revoked')
+        # Already checked in by another worker
+        CheckIn.objects.create(registration=self.registrations[2], event=self.event)
+        recorder.record(self.registrations[2].pk, self.event.pk)
+        self.assertEqual(recorder.flush(), 1)
+        self.assertEqual(CheckIn.objects.count(), 2)
+
+    def test_pending_check_ins_are_flushed_on_a_timer(self):
+        flushed = threading.Event()
+        recorder = tickets.CheckInRecorder(batch_size=10, max_delay=0.01)
+        recorder.flush = flushed.set
+        recorder.record(self.registrations[0].pk, self.event.pk)
+        self.assertTrue(flushed.wait(5))
+
+    def test_dashboard_ticket_and_check_in_endpoint(self):
+        self.client.force_login(self.guests[0])
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, self.tokens[0])
+        self.assertContains(response, '<svg')
+
+        self.client.force_login(self.staff)
+        response = self.client.post(reverse('check_in'), {'ticket': self.tokens[0], 'event': self.event.pk})
+        self.assertEqual(response.json(), {'status': 'ok', 'registration': self.registrations[0].pk})
+        response = self.client.post(reverse('check_in'), {'ticket': self.tokens[0]})
+        self.assertEqual(response.status_code, 409)
+        tickets.recorder.flush()
+        self.assertTrue(CheckIn.objects.filter(registration=self.registrations[0]).exists())
+
+
+class SeatStreamTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('fan', password='pass12345')
+        self.event = Event.objects.create(title='Release', description='', event_type='party',
+                                          date=timezone.now() + timedelta(days=1),
+                                          location='Kisii', max_attendees=10, current_attendees=3)
+
+    async def test_publisher_coalesces_bursts(self):
+        publisher = SeatPublisher()
+        queue = publisher.subscribe([1])
+        other = publisher.subscribe([2])
+        for current in range(5):
+            publisher.publish(1, current, 10)
+        self.assertEqual(publisher.flush(), 1)
+        self.assertEqual(queue.qsize(), 1)
+        self.assertEqual(queue.get_nowait()['current_attendees'], 4)
+        self.assertTrue(other.empty())
+        publisher.unsubscribe(queue, [1])
+        publisher.unsubscribe(other, [2])
+        self.assertEqual(dict(publisher.subscribers), {})
+
+    def test_event_saves_are_published(self):
+        with self.settings(SEAT_UPDATE_INTERVAL=60):
+            self.event.current_attendees = 4
+            self.event.save()
+        self.assertEqual(live.publisher.pending[self.event.pk]['seats_left'], 6)
+
+    def test_wsgi_request_gets_snapshot_only(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('seat_stream'), {'event': self.event.pk})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        with self.assertWarns(Warning):
+            body = b''.join(response).decode()
+        self.assertIn('retry: 30000', body)
+        self.assertIn('"current_attendees": 3', body)
+
+    def test_event_pages_subscribe_to_stream(self):
+        self.client.force_login(self.user)
+        for url in [reverse('events'), reverse('event_detail', args=[self.event.pk])]:
+            response = self.client.get(url)
+            self.assertContains(response, f'data-seats="{self.event.pk}"')
+            self.assertContains(response, reverse('seat_stream'))
+
+
+class EventSeriesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('gamer', password='pass12345')
+        start = (timezone.now() + timedelta(days=1)).replace(microsecond=0)
+        self.series = EventSeries.objects.create(title='Game Night', description='', event_type='game',
+                                                 location='Kisii', max_attendees=8, start=start)
+
+    def test_rules(self):
+        start = datetime(2026, 1, 31, 18, tzinfo=dt_timezone.utc)
+        monthly = EventSeries(start=start, frequency='monthly', interval=1)
+        dates = list(monthly.occurrences(start, start + timedelta(days=100)))
+        self.assertEqual([d.day for d in dates], [31, 28, 31, 30])
+        weekly = EventSeries(start=start, frequency='weekly', interval=2, until=start + timedelta(weeks=4))
+        self.assertEqual(len(list(weekly.occurrences(start + timedelta(days=1), start + timedelta(days=365)))), 2)
+        self.assertTrue(weekly.is_occurrence(start + timedelta(weeks=2)))
+        self.assertFalse(weekly.is_occurrence(start + timedelta(weeks=1)))
+
+    def test_window_materialization_and_lazy_listing(self):
+        call_command('materialize_series', days=14, stdout=StringIO())
+        call_command('materialize_series', days=14, stdout=StringIO())
+        self.assertEqual(Event.objects.filter(series=self.series).count(), 2)
+
+        self.client.force_login(self.user)
+        events = self.client.get(reverse('events')).context['events']
+        self.assertEqual(len(events), 13)
+        self.assertEqual([e.date for e in events], sorted(e.date for e in events))
+        self.assertEqual(sum(1 for e in events if e.pk), 2)
+        self.assertEqual(Event.objects.count(), 2)
+
+    def test_first_registration_materializes_occurrence(self):
+        date = self.series.nth_occurrence(5)
+        url = reverse('register_occurrence', args=[self.series.pk, int(date.timestamp())])
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.assertFalse(Event.objects.exists())
+        response = self.client.post(url)
+        event = Event.objects.get(series=self.series)
+        self.assertRedirects(response, reverse('register_event', args=[event.pk]), fetch_redirect_response=False)
+        self.assertEqual((event.date, event.max_attendees, event.current_attendees), (date, 8, 0))
+
+        self.client.post(url)
+        self.assertEqual(Event.objects.filter(series=self.series).count(), 1)
+        bad = reverse('register_occurrence', args=[self.series.pk, int(date.timestamp()) + 3600])
+        self.assertEqual(self.client.post(bad).status_code, 404)
+        huge = reverse('register_occurrence', args=[self.series.pk, 10 ** 20])
+        self.assertEqual(self.client.post(huge).status_code, 404)
+
+    def test_cancelled_occurrence_stays_cancelled(self):
+        date = self.series.nth_occurrence(3)
+        event = self.series.materialize(date)
+        event.is_active = False
+        event.save()
+        self.client.force_login(self.user)
+        events = self.client.get(reverse('events')).context['events']
+        self.assertNotIn(date, [e.date for e in events])
+        url = reverse('register_occurrence', args=[self.series.pk, int(date.timestamp())])
+        self.assertEqual(self.client.post(url).status_code, 404)
+
+
+class ThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        buckets.reset()
+        self.addCleanup(buckets.reset)
+
+    def test_token_bucket_refills_at_rate(self):
+        now = [0.0]
+        limiter = TokenBuckets(clock=lambda: now[0])
+        self.assertEqual([limiter.consume('k', '3/m') for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(limiter.consume('k', '3/m'), 20)
+        now[0] = 20
+        self.assertEqual(limiter.consume('k', '3/m'), 0)
+        self.assertEqual(limiter.consume('other', '3/m'), 0)
+
+    def test_login_and_register_are_throttled_before_hashing(self):
+        for _ in range(10):
+            self.client.post(reverse('login'), {'username': 'x', 'password': 'y'})
+        with self.assertNumQueries(0):
+            response = self.client.post(reverse('login'), {'username': 'x', 'password': 'y'})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(self.client.get(reverse('login')).status_code, 200)
+
+        for _ in range(5):
+            self.client.post(reverse('register'), {'username': 'x'})
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.post(reverse('register'), {'username': 'x'}).status_code, 429)
+        # Other clients are unaffected
+        response = self.client.post(reverse('register'), {'username': 'x'}, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(THROTTLE_RATES={'event_detail': {'user': '20/m'}})
+    def test_abusive_client_is_throttled_per_user(self):
+        # Latency under load is measured by manage.py bench_throttle
+        event = Event.objects.create(title='Expo', description='', event_type='meetup',
+                                     date=timezone.now() + timedelta(days=3), location='Kisii', max_attendees=50)
+        url = reverse('event_detail', args=[event.pk])
+        legit, bot = self.client_class(REMOTE_ADDR='10.0.0.1'), self.client_class(REMOTE_ADDR='10.0.0.66')
+        legit.force_login(User.objects.create_user('wanjiru', password='pass12345'))
+        bot.force_login(User.objects.create_user('bot', password='pass12345'))
+
+        legit_codes, bot_codes = [], []
+        for _ in range(10):
+            legit_codes.append(legit.get(url).status_code)
+            bot_codes.extend(bot.get(url).status_code for _ in range(10))
+
+        self.assertEqual(legit_codes, [200] * 10)
+        self.assertEqual(bot_codes.count(200), 20)
+        self.assertEqual(bot_codes.count(429), 80)
+        self.assertEqual(Trending.objects.get(event=event).clicks, 10 + 20)
+
+    def test_bench_command(self):
+        out = StringIO()
+        call_command('bench_throttle', requests=3, burst=5, stdout=out)
+        self.assertIn('legitimate, under attack', out.getvalue())
+        self.assertFalse(Event.objects.exists())
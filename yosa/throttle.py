@@ -0,0 +1,105 @@
+"""
+Token-bucket rate limiting for views that are expensive to serve.
+
+Each policy gives a rate like '10/m': the bucket holds up to 10 tokens and
+refills at 10 per minute, so clients may burst up to the limit and then
+settle at the rate. Buckets are kept in process, keyed by scope and by
+client IP or user, and the oldest are dropped past THROTTLE_MAX_KEYS. With
+several worker processes each one enforces the limit on its own share of
+traffic, so a client gets at most workers x rate.
+
+Limits are checked before the view runs, so a throttled request costs a
+dict lookup and an empty 429 rather than queries or password hashing.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from django.conf import settings
+from django.http import HttpResponse
+from . import metrics
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+class TokenBuckets:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.buckets = OrderedDict()
+
+    @property
+    def max_keys(self):
+        return getattr(settings, 'THROTTLE_MAX_KEYS', 10000)
+
+    def consume(self, key, rate):
+        # Take a token; returns 0 if allowed, else seconds until one is available
+        capacity, period = parse_rate(rate)
+        refill = capacity / period
+        now = self.clock()
+        with self.lock:
+            tokens, stamp = self.buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - stamp) * refill)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / refill
+            self.buckets[key] = (tokens, now)
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        return wait
+
+    def reset(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+buckets = TokenBuckets()
+
+
+def client_ip(request):
+    # Behind nginx set THROTTLE_IP_HEADER = 'HTTP_X_REAL_IP'
+    return request.META.get(getattr(settings, 'THROTTLE_IP_HEADER', 'REMOTE_ADDR'), '')
+
+
+def throttle(scope, ip=None, user=None, methods=None):
+    """
+    Limit a view per client IP and/or per user, e.g.
+    `@throttle('login', ip='10/m', methods=['POST'])`.
+
+    The `user` limit falls back to the IP for anonymous requests.
+    THROTTLE_RATES[scope] can override either rate, or disable it with None.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if getattr(settings, 'THROTTLE_ENABLED', True) and (methods is None or request.method in methods):
+                rates = {'ip': ip, 'user': user, **getattr(settings, 'THROTTLE_RATES', {}).get(scope, {})}
+                wait = 0
+                if rates['ip']:
+                    wait = buckets.consume(f'{scope}:ip:{client_ip(request)}', rates['ip'])
+                if not wait and rates['user']:
+                    if request.user.is_authenticated:
+                        key = f'{scope}:user:{request.user.pk}'
+                    else:
+                        key = f'{scope}:anon:{client_ip(request)}'
+                    wait = buckets.consume(key, rates['user'])
+                if wait:
+                    metrics.THROTTLED.inc(scope=scope)
+                    return too_many_requests(wait)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def too_many_requests(wait):
+    response = HttpResponse('Too many requests, please slow down.', status=429, content_type='text/plain')
+    response['Retry-After'] = str(math.ceil(wait))
+    return response
@@ -0,0 +1,188 @@
+"""
+Signed event tickets that can be validated at the door without a database read.
+
+A ticket is "<registration id>.<event id>:<signature>", signed with
+SECRET_KEY. Cancelled and deleted registrations (the latter through
+RevokedTicket tombstones) are tracked in a Bloom filter that each
+process rebuilds at most every REVOCATION_TTL seconds; only tickets the filter
+flags (revoked, or a rare false positive) are checked against the database.
+Check-ins are buffered and written in batches, on a timer if scans stop.
+"""
+import atexit
+import hashlib
+import math
+import threading
+import time
+from functools import lru_cache
+import qrcode
+import qrcode.image.svg
+from django.core import signing
+from django.db import connection, transaction
+from .models import Registration, ArchivedRegistration, CheckIn, RevokedTicket
+
+TICKET_SALT = 'yosa.tickets'
+REVOCATION_TTL = 60
+
+_signer = signing.Signer(salt=TICKET_SALT)
+
+
+def ticket_token(registration):
+    return _signer.sign(f'{registration.pk}.{registration.event_id}')
+
+
+def read_ticket(token):
+    """Return (registration_id, event_id); raises signing.BadSignature."""
+    registration_id, event_id = _signer.unsign(token.strip()).split('.')
+    return int(registration_id), int(event_id)
+
+
+@lru_cache(maxsize=1024)
+def ticket_qr_svg(token):
+    image = qrcode.make(token, image_factory=qrcode.image.svg.SvgPathImage, box_size=8)
+    return image.to_string(encoding='unicode')
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.001):
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(str(item).encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+def build_revocations():
+    revoked = list(Registration.objects.exclude(status='confirmed').values_list('id', flat=True))
+    revoked += ArchivedRegistration.objects.exclude(status='confirmed').values_list('id', flat=True)
+    revoked += RevokedTicket.objects.values_list('registration_id', flat=True)
+    bloom = BloomFilter(capacity=max(2 * len(revoked), 1000))
+    for registration_id in revoked:
+        bloom.add(registration_id)
+    return bloom
+
+
+_revocations = None
+_revocations_built = 0.0
+
+
+def get_revocations():
+    global _revocations, _revocations_built
+    if _revocations is None or time.monotonic() - _revocations_built > REVOCATION_TTL:
+        _revocations = build_revocations()
+        _revocations_built = time.monotonic()
+    return _revocations
+
+
+def preload_revocations(bloom=None):
+    global _revocations, _revocations_built
+    _revocations = bloom or build_revocations()
+    _revocations_built = time.monotonic()
+
+
+def revoke(registration_id, deleted=False):
+    # Other processes pick this up on their next rebuild; deleted
+    # registrations leave a tombstone so the rebuilt filters still have them
+    if deleted:
+        RevokedTicket.objects.bulk_create([RevokedTicket(registration_id=registration_id)],
+                                          ignore_conflicts=True)
+    if _revocations is not None:
+        _revocations.add(registration_id)
+
+
+class CheckInRecorder:
+    """
+    Buffers check-ins and writes them in batches, when batch_size are
+    pending or max_delay seconds after the oldest, whichever comes first.
+
+    Duplicate scans are caught from `seen`, which is per process: two
+    workers can each answer 'ok' for the same ticket. The OneToOne on
+    CheckIn.registration still keeps a single row, and flush() skips guests
+    that another worker has already written. Run the door scanners against
+    one worker if a second 'ok' matters.
+    """
+
+    def __init__(self, batch_size=50, max_delay=2.0):
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        self.pending = []
+        self.seen = set()
+        self.timer = None
+
+    def record(self, registration_id, event_id, checked_in_by=None):
+        """Queue a check-in; returns False if this process has already seen it."""
+        with self.lock:
+            if registration_id in self.seen:
+                return False
+            self.seen.add(registration_id)
+            self.pending.append(CheckIn(registration_id=registration_id, event_id=event_id,
+                                        checked_in_by=checked_in_by))
+            due = len(self.pending) >= self.batch_size
+            if not due and self.timer is None and math.isfinite(self.max_delay):
+                # Write the batch even if no further scan arrives
+                self.timer = threading.Timer(self.max_delay, self._flush_in_background)
+                self.timer.daemon = True
+                self.timer.start()
+        if due:
+            self.flush()
+        return True
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+    def flush(self):
+        with self.lock:
+            batch, self.pending = self.pending, []
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if not batch:
+            return 0
+        # Drop guests whose registration was deleted, or who another worker
+        # already checked in, so one bad row can't fail the whole batch
+        wanted = set(Registration.objects.filter(
+            pk__in=[row.registration_id for row in batch],
+            check_in__isnull=True
+        ).values_list('pk', flat=True))
+        batch = [row for row in batch if row.registration_id in wanted]
+        with transaction.atomic():
+            CheckIn.objects.bulk_create(batch, ignore_conflicts=True)
+        return len(batch)
+
+
+recorder = CheckInRecorder()
+atexit.register(recorder.flush)
+
+
+def check_in(token, event_id=None, checked_in_by=None, recorder=recorder):
+    """
+    Validate a scanned ticket and queue the check-in. Returns
+    (status, registration_id) with status one of 'ok', 'invalid',
+    'wrong_event', 'revoked' or 'duplicate'.
+    """
+    try:
+        registration_id, ticket_event_id = read_ticket(token)
+    except (signing.BadSignature, ValueError):
+        return 'invalid', None
+    if event_id is not None and ticket_event_id != event_id:
+        return 'wrong_event', registration_id
+    if registration_id in get_revocations() and not Registration.objects.filter(
+        pk=registration_id, status='confirmed'
+    ).exists():
+        return 'revoked', registration_id
+    if not recorder.record(registration_id, ticket_event_id, checked_in_by):
+        return 'duplicate', registration_id
+    return 'ok', registration_id
@@ -1,12 +1,14 @@
 from django.urls import path
 from django.contrib.auth import views as auth_views
 from . import views
+from .throttle import throttle
 
 urlpatterns = [
     # Home and Auth
     path('', views.home, name='home'),
     path('register/', views.register, name='register'),
-    path('login/', auth_views.LoginView.as_view(template_name='yosa/login.html'), name='login'),
+    path('login/', throttle('login', ip='10/m', methods=['POST'])(
+        auth_views.LoginView.as_view(template_name='yosa/login.html')), name='login'),
     path('logout/', auth_views.LogoutView.as_view(), name='logout'),
     
     # Dashboard
@@ -14,8 +16,10 @@ urlpatterns = [
     
     # Events
     path('events/', views.events_list, name='events'),
+    path('events/seats/', views.seat_stream, name='seat_stream'),
     path('events/<int:event_id>/', views.event_detail, name='event_detail'),
     path('events/<int:event_id>/register/', views.register_event, name='register_event'),
+    path('events/series/<int:series_id>/<int:timestamp>/register/', views.register_occurrence, name='register_occurrence'),
       path('past-events/', views.past_events, name='past_events'),
     
     # Profile
@@ -26,7 +30,12 @@ urlpatterns = [
     path('messages/send/', views.send_message, name='send_message'),
     path('feedback/', views.send_feedback, name='send_feedback'),
     path('messages/<int:message_id>/', views.message_detail, name='message_detail'),
+    path('messages/broadcast/', views.send_broadcast, name='send_broadcast'),
     
     # Feedback
     path('feedback/', views.send_feedback, name='send_feedback'),
+    
+    # Staff
+    path('staff/analytics/', views.analytics, name='analytics'),
+    path('staff/check-in/', views.check_in_view, name='check_in'),
 ]
\ No newline at end of file
@@ -1,12 +1,39 @@
+import asyncio
+import heapq
+import json
+import math
+import mimetypes
+import os
+import re
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import chain
+from urllib.parse import quote
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.views.decorators.http import condition, require_POST
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.db.models import Count, Q
+from django.db.models import Count, Exists, Q, Sum, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from .models import User, Event, Registration, Message, Trending
+from .models import (User, Event, EventSeries, Registration, Message, Broadcast, BroadcastReceipt,
+                     Trending, FriendsAttending, ArchivedEvent, ArchivedRegistration,
+                     DailyEventStats)
+from . import metrics
+from .analytics import update_daily_stats
+from .geo import events_near
+from .live import publisher
+from .throttle import throttle
+from .tickets import check_in, ticket_token, ticket_qr_svg
 from .forms import (CustomUserCreationForm, UserUpdateForm, 
-                    EventRegistrationForm, MessageForm, FeedbackForm,EventForm)
+                    EventRegistrationForm, MessageForm, FeedbackForm,EventForm,
+                    BroadcastForm)
 
 def home(request):
     upcoming_events = Event.objects.filter(
@@ -24,6 +51,7 @@ def home(request):
     }
     return render(request, 'yosa/home.html', context)
 
+@throttle('register', ip='5/m', methods=['POST'])
 def register(request):
     if request.method == 'POST':
         form = CustomUserCreationForm(request.POST)
@@ -43,27 +71,48 @@ def dashboard(request):
         status='confirmed'
     ).select_related('event')
     
-    upcoming_registrations = registrations.filter(event__date__gte=timezone.now())
+    upcoming_registrations = list(registrations.filter(event__date__gte=timezone.now()))
     past_registrations = registrations.filter(event__date__lt=timezone.now())
     
+    # Door tickets, verified offline by check_in
+    for reg in upcoming_registrations:
+        reg.ticket = ticket_token(reg)
+        reg.ticket_qr = ticket_qr_svg(reg.ticket)
+    
     # Update trending views
     for reg in upcoming_registrations:
         trending, created = Trending.objects.get_or_create(event=reg.event)
         trending.views += 1
         trending.save()
+        update_daily_stats(reg.event, views=1)
+        metrics.TRENDING_WRITES.inc(kind='views')
     
-    # Count friends registered
-    friends_count = Registration.objects.filter(
+    # Count friends registered, from the precomputed per-event counts
+    friends_count = FriendsAttending.objects.filter(
+        user=user,
         event__date__gte=timezone.now()
-    ).exclude(user=user).count()
+    ).aggregate(total=Sum('count'))['total'] or 0
     
-    # Upcoming events
-    upcoming_events = Event.objects.filter(
+    # Upcoming events, ranked by similarity to the ones already registered for
+    registered_ids = registrations.values_list('event_id', flat=True)
+    upcoming_events = list(Event.objects.filter(
+        similar_to__event_id__in=registered_ids,
         date__gte=timezone.now(),
         is_active=True
     ).exclude(
-        id__in=registrations.values_list('event_id', flat=True)
-    ).order_by('date')[:5]
+        id__in=registered_ids
+    ).annotate(
+        score=Sum('similar_to__score')
+    ).order_by('-score', 'date')[:5])
+    
+    # Fall back to the next events by date when there is nothing to go on
+    if not upcoming_events:
+        upcoming_events = Event.objects.filter(
+            date__gte=timezone.now(),
+            is_active=True
+        ).exclude(
+            id__in=registered_ids
+        ).order_by('date')[:5]
     
     # Trending events
     trending = Trending.objects.select_related('event').filter(
@@ -80,14 +129,7 @@ def dashboard(request):
     }
     return render(request, 'yosa/dashboard.html', context)
 
-@login_required
-def events_list(request):
-    events = Event.objects.filter(
-        date__gte=timezone.now(),
-        is_active=True
-    ).order_by('date')
-    return render(request, 'yosa/events.html', {'events': events})
-
+@throttle('event_detail', ip='300/m', user='60/m')
 @login_required
 def event_detail(request, event_id):
     event = get_object_or_404(Event, id=event_id)
@@ -101,6 +143,8 @@ def event_detail(request, event_id):
     trending, created = Trending.objects.get_or_create(event=event)
     trending.clicks += 1
     trending.save()
+    update_daily_stats(event, clicks=1)
+    metrics.TRENDING_WRITES.inc(kind='clicks')
     
     return render(request, 'yosa/event_detail.html', {
         'event': event,
@@ -108,6 +152,47 @@ def event_detail(request, event_id):
         'seats_left': event.seats_left(),
     })
 
+@login_required
+async def seat_stream(request):
+    # Server-sent events with seat counts for ?event=<id>&event=<id>...
+    event_ids = [int(pk) for pk in request.GET.getlist('event') if pk.isdigit()][:50]
+    # Under WSGI an open stream would hold a worker thread for as long as the
+    # client stays connected, so only send the snapshot and ask it to retry
+    live = isinstance(request, ASGIRequest)
+    
+    async def stream():
+        queue = publisher.subscribe(event_ids) if live else None
+        try:
+            if not live:
+                yield 'retry: 30000\n\n'
+            async for event in Event.objects.filter(id__in=event_ids).only(
+                'current_attendees', 'max_attendees'
+            ):
+                yield sse_message({
+                    'event': event.pk,
+                    'current_attendees': event.current_attendees,
+                    'max_attendees': event.max_attendees,
+                    'seats_left': event.seats_left(),
+                })
+            while live:
+                try:
+                    update = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                else:
+                    yield sse_message(update)
+        finally:
+            if queue is not None:
+                publisher.unsubscribe(queue, event_ids)
+    
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+def sse_message(data):
+    return f'event: seats\ndata: {json.dumps(data)}\n\n'
+
 @login_required
 def register_event(request, event_id):
     event = get_object_or_404(Event, id=event_id)
@@ -123,8 +208,10 @@ def register_event(request, event_id):
                 registration.save()
                 event.current_attendees += 1
                 event.save()
+                metrics.REGISTRATIONS.inc(result='success')
                 messages.success(request, f'Successfully registered for {event.title}!')
             else:
+                metrics.REGISTRATIONS.inc(result='full')
                 messages.error(request, 'Sorry, this event is full.')
             
             return redirect('dashboard')
@@ -220,6 +307,17 @@ def past_events(request):
         is_active=True
     ).order_by('-date')
     
+    # Anything in the archive is older than what is left in the hot tables,
+    # so appending keeps the newest-first order
+    archived_registrations = ArchivedRegistration.objects.filter(
+        user=request.user,
+        status='confirmed'
+    ).select_related('event').order_by('-event__date')
+    archived_events = ArchivedEvent.objects.filter(is_active=True).order_by('-date')
+    
+    past_registrations = list(chain(past_registrations, archived_registrations))
+    all_past_events = list(chain(all_past_events, archived_events))
+    
     context = {
         'past_registrations': past_registrations,
         'all_past_events': all_past_events,
@@ -228,24 +326,116 @@ def past_events(request):
 
 @login_required
 def events_list(request):
+    friends_attending = FriendsAttending.objects.filter(
+        user=request.user,
+        event=OuterRef('pk')
+    ).values('count')[:1]
     events = Event.objects.filter(
         date__gte=timezone.now(),
         is_active=True
+    ).annotate(
+        friends_attending=Coalesce(Subquery(friends_attending), 0)
     ).order_by('date')
-    return render(request, 'yosa/events.html', {'events': events})
+    
+    # "Near me": ?lat=..&lng=..[&radius=km]
+    try:
+        lat = float(request.GET['lat'])
+        lng = float(request.GET['lng'])
+        radius = min(float(request.GET.get('radius', 25)), 500)
+        # float() also accepts inf/nan, which break the bounding box maths
+        if not (math.isfinite(lat) and math.isfinite(lng) and math.isfinite(radius)):
+            raise ValueError
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180 and radius > 0):
+            raise ValueError
+    except (KeyError, ValueError):
+        lat = lng = None
+    if lat is not None:
+        events = events_near(events, lat, lng, radius_km=radius)
+    else:
+        events = list(events)
+        events = list(heapq.merge(events, series_occurrences(events), key=lambda event: event.date))
+    
+    return render(request, 'yosa/events.html', {'events': events, 'near_me': lat is not None})
+
+SERIES_CACHE_KEY = 'yosa:active_series'
+
+def active_series():
+    # Dropped on save/delete in this process (see signals.py); the timeout
+    # bounds how long other workers list a stale set
+    all_series = cache.get(SERIES_CACHE_KEY)
+    if all_series is None:
+        all_series = list(EventSeries.objects.filter(is_active=True).select_related('venue'))
+        cache.set(SERIES_CACHE_KEY, all_series, getattr(settings, 'SERIES_CACHE_TIMEOUT', 60))
+    return all_series
+
+def series_occurrences(events):
+    # Upcoming occurrences of recurring series that aren't among the already
+    # fetched events, expanded from the rule as unsaved Events in date order
+    now = timezone.now()
+    until = now + timedelta(days=settings.SERIES_LISTING_DAYS)
+    all_series = active_series()
+    if not all_series:
+        return []
+    # Occurrences staff deactivated aren't in `events` but mustn't come back
+    existing = {(event.series_id, event.date) for event in events if event.series_id}
+    existing.update(Event.objects.filter(
+        series__in=all_series,
+        is_active=False,
+        date__gte=now,
+        date__lt=until
+    ).values_list('series_id', 'date'))
+    
+    occurrences = []
+    for series in all_series:
+        for date in series.occurrences(now, until):
+            if (series.pk, date) not in existing:
+                event = series.build_occurrence(date)
+                event.friends_attending = 0
+                occurrences.append(event)
+    occurrences.sort(key=lambda event: event.date)
+    return occurrences
+
+@throttle('register_occurrence', user='20/m')
+@login_required
+@require_POST
+def register_occurrence(request, series_id, timestamp):
+    # First registration for an occurrence creates its Event row, so seats
+    # are counted per occurrence from then on
+    series = get_object_or_404(EventSeries, id=series_id, is_active=True)
+    try:
+        date = datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+    except (OverflowError, OSError, ValueError):
+        raise Http404('No such occurrence')
+    if date < timezone.now() or not series.is_occurrence(date):
+        raise Http404('No such occurrence')
+    event = series.materialize(date)
+    if not event.is_active:
+        raise Http404('This occurrence has been cancelled')
+    return redirect('register_event', event_id=event.id)
 
 @login_required
 def messages_list(request):
     user_messages = Message.objects.filter(
         Q(receiver=request.user) | Q(is_feedback=True)
-    ).order_by('-created_at')
+    ).select_related('sender').order_by('-created_at')
+    
+    broadcasts = Broadcast.for_user(request.user).annotate(
+        is_read=Exists(BroadcastReceipt.objects.filter(broadcast=OuterRef('pk'), user=request.user))
+    ).select_related('sender').order_by('-created_at')
+    
+    inbox = sorted(chain(user_messages, broadcasts), key=lambda item: item.created_at, reverse=True)
     
-    # Mark messages as read when viewed
+    # Mark messages as read when viewed; broadcast receipts are only
+    # created here, the first time each recipient sees them
     unread_messages = user_messages.filter(is_read=False)
     unread_messages.update(is_read=True)
+    BroadcastReceipt.objects.bulk_create([
+        BroadcastReceipt(broadcast=broadcast, user=request.user)
+        for broadcast in broadcasts if not broadcast.is_read
+    ], ignore_conflicts=True)
     
     return render(request, 'yosa/messages.html', {
-        'messages': user_messages,
+        'inbox': inbox,
     })
 
 @login_required
@@ -315,6 +505,96 @@ def admin_dashboard(request):
     }
     return render(request, 'yosa/admin_dashboard.html', context)
 
+@login_required
+@staff_member_required
+def send_broadcast(request):
+    # One Broadcast row plus its event links, however many attendees there are
+    if request.method == 'POST':
+        form = BroadcastForm(request.POST)
+        if form.is_valid():
+            broadcast = form.save(commit=False)
+            broadcast.sender = request.user
+            broadcast.save()
+            form.save_m2m()
+            messages.success(request, 'Broadcast sent to all confirmed attendees!')
+            return redirect('messages')
+    else:
+        form = BroadcastForm(initial={'events': request.GET.getlist('event')})
+    
+    return render(request, 'yosa/send_broadcast.html', {'form': form})
+
+@login_required
+@staff_member_required
+def analytics(request):
+    # Reads only the DailyEventStats rollups, never raw registrations
+    try:
+        days = min(max(int(request.GET.get('days', 30)), 1), 365)
+    except ValueError:
+        days = 30
+    since = timezone.localdate() - timedelta(days=days - 1)
+    stats = DailyEventStats.objects.filter(day__gte=since)
+    
+    event_id = request.GET.get('event')
+    if event_id and event_id.isdigit():
+        stats = stats.filter(event_id=event_id)
+    
+    daily = list(stats.values('day').annotate(
+        registrations=Sum('registrations'),
+        cancellations=Sum('cancellations'),
+        views=Sum('views'),
+        clicks=Sum('clicks'),
+        attendees=Sum('attendees'),
+        capacity=Sum('capacity'),
+    ).order_by('day'))
+    
+    peak = max([row['registrations'] for row in daily] + [1])
+    for row in daily:
+        row['fill_rate'] = round(100 * row['attendees'] / row['capacity']) if row['capacity'] else 0
+        row['bar_height'] = round(100 * row['registrations'] / peak)
+    
+    by_type = stats.values('event_type').annotate(
+        registrations=Sum('registrations'),
+        cancellations=Sum('cancellations'),
+        views=Sum('views'),
+        clicks=Sum('clicks'),
+    ).order_by('-registrations')
+    type_names = dict(Event.EVENT_TYPES)
+    for row in by_type:
+        row['label'] = type_names.get(row['event_type'], row['event_type'])
+    
+    # Registrations per day per event type, one row per day
+    types = [key for key, _ in Event.EVENT_TYPES]
+    per_day = {}
+    for row in stats.values('day', 'event_type').annotate(registrations=Sum('registrations')):
+        per_day.setdefault(row['day'], dict.fromkeys(types, 0))[row['event_type']] = row['registrations']
+    daily_by_type = [
+        {'day': day, 'counts': [counts.get(key, 0) for key in types]}
+        for day, counts in sorted(per_day.items())
+    ]
+    
+    by_event = list(stats.values('event_id').annotate(
+        registrations=Sum('registrations'),
+        cancellations=Sum('cancellations'),
+    ).order_by('-registrations')[:20])
+    ids = [row['event_id'] for row in by_event]
+    titles = {pk: event.title for pk, event in Event.objects.only('title').in_bulk(ids).items()}
+    missing = [pk for pk in ids if pk not in titles]
+    if missing:
+        titles.update((pk, event.title) for pk, event in ArchivedEvent.objects.only('title').in_bulk(missing).items())
+    for row in by_event:
+        row['title'] = titles.get(row['event_id'], f"#{row['event_id']}")
+    
+    context = {
+        'days': days,
+        'event_id': event_id,
+        'daily': daily,
+        'by_type': by_type,
+        'type_labels': [type_names[key] for key in types],
+        'daily_by_type': daily_by_type,
+        'by_event': by_event,
+    }
+    return render(request, 'yosa/analytics.html', context)
+
 @login_required
 @staff_member_required
 def create_event(request):
@@ -347,6 +627,100 @@ def edit_event(request, event_id):
         form = EventForm(instance=event)
     
     return render(request, 'yosa/edit_event.html', {'form': form, 'event': event})
+# Media files
+# Event images and avatars are only shown on logged-in pages. When a front
+# server is configured it sends the bytes itself (X-Accel-Redirect for nginx,
+# X-Sendfile for Apache/lighttpd); otherwise Django streams the file with
+# FileResponse, which uses wsgi.file_wrapper/sendfile where available.
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+def _media_etag(request, full_path, relative_path):
+    st = os.stat(full_path)
+    return f'{st.st_mtime_ns:x}-{st.st_size:x}'
+
+def _media_last_modified(request, full_path, relative_path):
+    return datetime.fromtimestamp(os.stat(full_path).st_mtime, tz=dt_timezone.utc)
+
+def _read_range(full_path, start, length, block_size=8192):
+    with open(full_path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(block_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+@condition(etag_func=_media_etag, last_modified_func=_media_last_modified)
+def _media_response(request, full_path, relative_path):
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    size = os.path.getsize(full_path)
+    
+    accel_prefix = getattr(settings, 'MEDIA_X_ACCEL_REDIRECT_PREFIX', None)
+    if accel_prefix:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + quote(relative_path)
+        return response
+    if getattr(settings, 'MEDIA_X_SENDFILE', False):
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = full_path
+        return response
+    
+    match = RANGE_RE.match(request.headers.get('Range', ''))
+    if match and any(match.groups()):
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            start, end = max(size - int(last), 0), size - 1
+        if start > end or start >= size:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        response = StreamingHttpResponse(_read_range(full_path, start, end - start + 1),
+                                         status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    else:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+@login_required
+def serve_media(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('Invalid path')
+    if not os.path.isfile(full_path):
+        raise Http404('File not found')
+    
+    response = _media_response(request, full_path, path)
+    response['Cache-Control'] = 'private, max-age=3600'
+    return response
+
+@login_required
+@staff_member_required
+@require_POST
+def check_in_view(request):
+    # Signature and revocation checks need no database read; the check-in
+    # itself is written later in a batch
+    try:
+        event_id = int(request.POST['event']) if request.POST.get('event') else None
+    except ValueError:
+        event_id = None
+    status, registration_id = check_in(request.POST.get('ticket', ''), event_id=event_id,
+                                       checked_in_by=request.user)
+    return JsonResponse({'status': status, 'registration': registration_id},
+                        status=200 if status == 'ok' else 409 if status == 'duplicate' else 400)
+
+@login_required
+@staff_member_required
+def metrics_view(request):
+    return HttpResponse(metrics.collect(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 # Add error handler views
 def custom_404_view(request, exception):
     return render(request, 'yosa/404.html', status=404)